@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DicoEvent.settings")
+# Route the hot read endpoints to their async views
+os.environ.setdefault("DJANGO_ROOT_URLCONF", "DicoEvent.urls_asgi")
 
 application = get_asgi_application()
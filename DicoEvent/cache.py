@@ -0,0 +1,144 @@
+import asyncio
+import time
+import weakref
+import redis.asyncio
+from django.conf import settings
+from django.core.cache import cache
+from .metrics import record_cache_lookup
+
+# One asyncio Redis client per event loop (a client cannot be shared by loops)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _async_redis():
+    """Get the asyncio Redis client for the default cache's server."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = redis.asyncio.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+        _async_clients[loop] = client
+    return client
+
+
+def _is_django_redis():
+    return hasattr(getattr(cache, "client", None), "decode")
+
+
+async def aget(key):
+    """
+    Read a cache entry without blocking the event loop.
+
+    Entries are shared with the sync cache API: keys are built and values
+    decoded by django-redis itself, only the I/O goes through redis.asyncio.
+    Other backends fall back to Django's own async cache methods.
+    """
+    if not _is_django_redis():
+        return await cache.aget(key)
+    value = await _async_redis().get(cache.client.make_key(key))
+    return None if value is None else cache.client.decode(value)
+
+
+async def aget_many(keys):
+    """Read several cache entries in one round-trip without blocking the event loop."""
+    if not _is_django_redis():
+        return await cache.aget_many(keys)
+    if not keys:
+        return {}
+    values = await _async_redis().mget([cache.client.make_key(key) for key in keys])
+    return {
+        key: cache.client.decode(value)
+        for key, value in zip(keys, values)
+        if value is not None
+    }
+
+
+async def aset(key, value, timeout=None):
+    """Write a cache entry without blocking the event loop."""
+    if timeout is None:
+        timeout = settings.CACHE_TTL
+    if not _is_django_redis():
+        return await cache.aset(key, value, timeout)
+    await _async_redis().set(
+        cache.client.make_key(key), cache.client.encode(value), ex=timeout
+    )
+
+
+async def aadd(key, value, timeout=None):
+    """Write a cache entry unless it exists, without blocking the event loop."""
+    if not _is_django_redis():
+        return await cache.aadd(key, value, timeout)
+    return bool(
+        await _async_redis().set(
+            cache.client.make_key(key), cache.client.encode(value), ex=timeout, nx=True
+        )
+    )
+
+
+class CacheNamespace:
+    """
+    A family of cache entries that can be invalidated all at once.
+
+    Every key in the namespace embeds the namespace's current generation,
+    so bumping the generation with a single INCR orphans every entry written
+    before it (they simply age out through their TTL). This replaces
+    deleting list pages one key at a time.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.generation_key = f"{name}_generation"
+
+    def generation(self):
+        """Get the current generation, seeding it on first use."""
+        generation = cache.get(self.generation_key)
+        if generation is None:
+            # Seed from the clock so a lost counter never restarts at a
+            # generation whose entries may still be cached.
+            cache.add(self.generation_key, time.time_ns() // 1_000_000, None)
+            generation = cache.get(self.generation_key)
+        return generation
+
+    async def ageneration(self):
+        """Async variant of ``generation``."""
+        generation = await aget(self.generation_key)
+        if generation is None:
+            await aadd(self.generation_key, time.time_ns() // 1_000_000)
+            generation = await aget(self.generation_key)
+        return generation
+
+    def key(self, suffix):
+        """Build the versioned cache key for an entry in this namespace."""
+        return f"{self.name}_v{self.generation()}_{suffix}"
+
+    async def akey(self, suffix):
+        """Async variant of ``key``."""
+        return f"{self.name}_v{await self.ageneration()}_{suffix}"
+
+    def get(self, suffix):
+        value = cache.get(self.key(suffix))
+        record_cache_lookup(self.name, value is not None)
+        return value
+
+    async def aget(self, suffix):
+        value = await aget(await self.akey(suffix))
+        record_cache_lookup(self.name, value is not None)
+        return value
+
+    def set(self, suffix, value, timeout=None):
+        if timeout is None:
+            timeout = settings.CACHE_TTL
+        cache.set(self.key(suffix), value, timeout)
+
+    async def aset(self, suffix, value, timeout=None):
+        await aset(await self.akey(suffix), value, timeout)
+
+    def delete(self, suffix):
+        cache.delete(self.key(suffix))
+
+    def invalidate(self):
+        """Invalidate every entry in the namespace in O(1)."""
+        try:
+            cache.incr(self.generation_key)
+        except ValueError:
+            # No generation yet: the next reader seeds a fresh one
+            pass
@@ -11,9 +11,33 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 app.conf.beat_schedule = {
-    'send-event-reminders': {
-        'task': 'events.tasks.send_event_reminders',
-        'schedule': crontab(minute='*/15'),  # Check every 15 minutes
+    'dispatch-due-reminders': {
+        'task': 'events.tasks.dispatch_due_reminders',
+        'schedule': crontab(),  # Every minute, reads only the due reminders
+    },
+    'relay-outbox': {
+        'task': 'registrations.tasks.relay_outbox',
+        # Seconds between runs; bounds the delay added to outbox tasks
+        'schedule': float(os.getenv('OUTBOX_RELAY_INTERVAL', '2')),
+    },
+    'promote-waitlists': {
+        'task': 'registrations.tasks.promote_waitlists',
+        'schedule': float(os.getenv('WAITLIST_PROMOTION_INTERVAL', '2')),
+    },
+    'sweep-waitlists': {
+        'task': 'registrations.tasks.promote_waitlists',
+        # Catches seats no release flagged (quota raised, Redis restarted)
+        'schedule': crontab(minute='*/15'),
+        'kwargs': {'sweep': True},
+    },
+    'expire-seat-holds': {
+        'task': 'registrations.tasks.expire_seat_holds',
+        # Seconds an expired hold can keep its seat past SEAT_HOLD_TTL
+        'schedule': float(os.getenv('SEAT_HOLD_SWEEP_INTERVAL', '30')),
+    },
+    'reconcile-seat-counters': {
+        'task': 'registrations.tasks.reconcile_seat_counters',
+        'schedule': crontab(minute='*/15'),
     },
 }
 
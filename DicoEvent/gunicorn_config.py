@@ -0,0 +1,85 @@
+"""
+Gunicorn settings for serving DicoEvent in production.
+
+    gunicorn -c python:DicoEvent.gunicorn_config DicoEvent.wsgi:application
+
+Every setting can be overridden through a GUNICORN_* environment variable.
+`kill -HUP <master>` reloads the configuration and replaces the workers
+gracefully; with preload on, code changes need a restart (or USR2 + WINCH).
+"""
+
+import os
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() in ("true", "1", "yes")
+
+
+def _cpu_count():
+    """CPUs this process may run on, which respects container CPU sets."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cpus = _cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+
+# gthread workers: the views mostly wait on Postgres, Redis and MinIO, so a
+# few threads per process overlap that I/O without multiplying memory.
+# For the async read endpoints use uvicorn.workers.UvicornWorker together
+# with DicoEvent.asgi:application.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "sync":
+    default_workers = 2 * cpus + 1
+    default_threads = 1
+else:
+    default_workers = cpus + 1
+    default_threads = 4
+workers = int(os.getenv("GUNICORN_WORKERS", str(default_workers)))
+threads = int(os.getenv("GUNICORN_THREADS", str(default_threads)))
+
+# Import Django once in the master so workers fork with it already loaded
+preload_app = _env_bool("GUNICORN_PRELOAD", "True")
+
+# Recycle workers now and then to bound memory growth; the jitter keeps
+# them from all restarting at the same moment
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# Keep connections from the load balancer open between requests. This must
+# stay below the balancer's own idle timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Request logging is done by DicoEvent.middleware.LoggingMiddleware
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Samples left by a previous run would be aggregated into /metrics
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the master while preloading
+    from django.db import connections
+
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
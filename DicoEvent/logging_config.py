@@ -1,3 +1,4 @@
+import atexit
 import os
 import sys
 from pathlib import Path
@@ -27,6 +28,9 @@ def configure_logging():
             level="DEBUG"
         )
     
+    # File sinks are enqueue'd: the calling thread only puts the record on
+    # a queue and a background thread does the formatting and disk writes.
+    
     # Application log file (INFO level and above)
     logger.add(
         LOGS_DIR / "application.log",
@@ -35,10 +39,12 @@ def configure_logging():
         rotation="1 day",
         retention="30 days",
         compression="zip",
+        enqueue=True,
         filter=lambda record: record["level"].no >= logger.level("INFO").no
     )
     
-    # Error log file (ERROR level and above)
+    # Error log file (ERROR level and above). diagnose stays off: it renders
+    # every local variable of the traceback, which is slow and leaks values.
     logger.add(
         LOGS_DIR / "error.log",
         format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}\n{exception}",
@@ -46,15 +52,32 @@ def configure_logging():
         rotation="1 day",
         retention="30 days",
         compression="zip",
+        enqueue=True,
         backtrace=True,
-        diagnose=True
+        diagnose=False
     )
     
+    # Structured request log, one JSON record per line, for log shippers
+    if os.getenv('LOG_JSON', 'False').lower() in ('true', '1', 'yes'):
+        logger.add(
+            LOGS_DIR / "access.json",
+            level="INFO",
+            rotation="1 day",
+            retention="30 days",
+            compression="zip",
+            enqueue=True,
+            serialize=True,
+            filter=lambda record: record["extra"].get("access", False)
+        )
+    
     return logger
 
 # Configure logging when module is imported
 app_logger = configure_logging()
 
+# Drain the enqueue'd sinks before the process exits
+atexit.register(logger.remove)
+
 def get_logger(name: str = None):
     """Get a logger instance with optional name binding."""
     if name:
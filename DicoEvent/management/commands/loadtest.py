@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import Counter
+
+import urllib3
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = "Send concurrent GET requests to a running server and report throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url",
+            help="Absolute URL to request, e.g. http://localhost:8000/api/events/",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Simultaneous keep-alive connections",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Seconds of measured load"
+        )
+        parser.add_argument(
+            "--warmup",
+            type=float,
+            default=3,
+            help="Seconds of unmeasured load beforehand",
+        )
+        parser.add_argument(
+            "--header",
+            action="append",
+            default=[],
+            help="Extra request header as 'Name: value' (repeatable), e.g. an Authorization token",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        if concurrency < 1 or options["duration"] <= 0:
+            raise CommandError("--concurrency and --duration must be positive")
+
+        headers = {}
+        for header in options["header"]:
+            name, sep, value = header.partition(":")
+            if not sep:
+                raise CommandError(f"Invalid header {header!r}, expected 'Name: value'")
+            headers[name.strip()] = value.strip()
+
+        # One keep-alive connection per client thread, as a browser or balancer would
+        http = urllib3.PoolManager(
+            maxsize=concurrency,
+            block=True,
+            retries=False,
+            timeout=urllib3.Timeout(connect=5, read=30),
+        )
+        url = options["url"]
+
+        start = time.monotonic()
+        measure_from = start + options["warmup"]
+        stop_at = measure_from + options["duration"]
+        latencies = []
+        statuses = Counter()
+        sources = Counter()
+        errors = Counter()
+        lock = threading.Lock()
+
+        def client():
+            local_latencies = []
+            local_statuses = Counter()
+            local_sources = Counter()
+            local_errors = Counter()
+            while True:
+                sent = time.monotonic()
+                if sent >= stop_at:
+                    break
+                try:
+                    response = http.request(
+                        "GET", url, headers=headers, preload_content=True
+                    )
+                except urllib3.exceptions.HTTPError as exc:
+                    if sent >= measure_from:
+                        local_errors[type(exc).__name__] += 1
+                    continue
+                if sent < measure_from:
+                    continue
+                local_latencies.append((time.monotonic() - sent) * 1000)
+                local_statuses[response.status] += 1
+                local_sources[response.headers.get("X-Data-Source", "-")] += 1
+            with lock:
+                latencies.extend(local_latencies)
+                statuses.update(local_statuses)
+                sources.update(local_sources)
+                errors.update(local_errors)
+
+        self.stdout.write(
+            f"GET {url} with {concurrency} connections for {options['duration']:g}s "
+            f"(after {options['warmup']:g}s warm-up)"
+        )
+        threads = [
+            threading.Thread(target=client, daemon=True) for _ in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        http.clear()
+
+        latencies.sort()
+        completed = len(latencies)
+        self.stdout.write(self.style.MIGRATE_HEADING("\nThroughput"))
+        self.stdout.write(
+            f"{completed} responses, {completed / options['duration']:.1f} req/s"
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING("\nLatency (ms)"))
+        if completed:
+            self.stdout.write(
+                f"mean {sum(latencies) / completed:.1f}  "
+                f"p50 {percentile(latencies, 0.50):.1f}  "
+                f"p90 {percentile(latencies, 0.90):.1f}  "
+                f"p99 {percentile(latencies, 0.99):.1f}  "
+                f"max {latencies[-1]:.1f}"
+            )
+        self.stdout.write(self.style.MIGRATE_HEADING("\nResponses"))
+        for status, count in sorted(statuses.items()):
+            self.stdout.write(f"HTTP {status}: {count}")
+        for source, count in sorted(sources.items()):
+            self.stdout.write(f"X-Data-Source {source}: {count}")
+        for error, count in sorted(errors.items()):
+            self.stdout.write(self.style.ERROR(f"{error}: {count}"))
+        if errors or any(status >= 500 for status in statuses):
+            self.stdout.write(
+                self.style.WARNING(
+                    "\nErrors were returned; the numbers above are not comparable"
+                )
+            )
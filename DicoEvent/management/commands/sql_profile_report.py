@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from DicoEvent.profiling import build_report, clear_profiles, load_profiles
+
+
+class Command(BaseCommand):
+    help = "Report the slowest and duplicated SQL statements of profiled requests"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Rows shown per table"
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete the stored profiles afterwards"
+        )
+
+    def handle(self, *args, **options):
+        profiles = load_profiles()
+        if not profiles:
+            self.stdout.write(
+                "No profiled requests. Set SQL_PROFILING_ENABLED and send X-Profile-SQL: 1."
+            )
+            return
+
+        report = build_report(profiles)
+        limit = options["limit"]
+        total_queries = sum(len(profile["queries"]) for profile in profiles)
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{len(profiles)} profiled requests, {total_queries} queries"
+            )
+        )
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING("\nSlowest statements (by total time)")
+        )
+        statements = sorted(
+            report["statements"].items(),
+            key=lambda item: item[1]["total_ms"],
+            reverse=True,
+        )
+        for statement, stats in statements[:limit]:
+            self.stdout.write(
+                f"{stats['total_ms']:10.2f}ms total  {stats['max_ms']:8.2f}ms max  "
+                f"{stats['count']:6d}x  {statement[:200]}"
+            )
+            for caller in sorted(stats["callers"])[:5]:
+                self.stdout.write(f"{'':40}{caller}")
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                "\nDuplicate queries (same statement and parameters in one request)"
+            )
+        )
+        duplicates = sorted(
+            report["duplicates"].items(),
+            key=lambda item: item[1]["extra_queries"],
+            reverse=True,
+        )
+        if not duplicates:
+            self.stdout.write("None")
+        for (view, statement), stats in duplicates[:limit]:
+            self.stdout.write(
+                f"{view}: {stats['extra_queries']} extra queries in {stats['requests']} requests  "
+                f"{statement[:200]}"
+            )
+            for caller in sorted(stats["callers"])[:5]:
+                self.stdout.write(f"{'':4}{caller}")
+
+        if options["clear"]:
+            clear_profiles()
+            self.stdout.write(self.style.SUCCESS("\nCleared stored profiles"))
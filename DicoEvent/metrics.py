@@ -0,0 +1,140 @@
+"""
+Prometheus metrics for the API and the Celery workers.
+
+When PROMETHEUS_MULTIPROC_DIR is set (required with several gunicorn or
+Celery worker processes) every process writes its samples to that
+directory and the /metrics view aggregates them; otherwise the metrics of
+the current process are served. The view answers only clients listed in
+METRICS_ALLOWED_IPS.
+"""
+
+import ipaddress
+import os
+import time
+from celery.signals import task_postrun, task_prerun, worker_ready
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+REQUEST_LATENCY = Histogram(
+    "dicoevent_http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    ["view", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    "dicoevent_http_requests_total",
+    "HTTP requests handled",
+    ["view", "method", "status"],
+)
+RESPONSE_SOURCES = Counter(
+    "dicoevent_http_response_source_total",
+    "Responses by X-Data-Source (cache or database)",
+    ["view", "source"],
+)
+REQUEST_QUERIES = Histogram(
+    "dicoevent_http_request_db_queries",
+    "Database queries executed per HTTP request",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_QUERY_TIME = Histogram(
+    "dicoevent_http_request_db_seconds",
+    "Time spent in database queries per HTTP request",
+    ["view"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_LOOKUPS = Counter(
+    "dicoevent_cache_lookups_total",
+    "Cache lookups by key family",
+    ["family", "result"],
+)
+WAITLIST_PROMOTION_LATENCY = Histogram(
+    "dicoevent_waitlist_promotion_seconds",
+    "Time from a seat being freed to its waitlist being promoted",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+TASK_LATENCY = Histogram(
+    "dicoevent_celery_task_duration_seconds",
+    "Celery task run time",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+TASKS = Counter(
+    "dicoevent_celery_tasks_total",
+    "Celery tasks run",
+    ["task", "state"],
+)
+
+
+def get_registry():
+    """Get the registry to expose, aggregating all processes in multiprocess mode."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _metrics_allowed(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(allowed, strict=False)
+        for allowed in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics_view(request):
+    """
+    Expose the metrics in the Prometheus text format. Other clients get a
+    404, as if the route did not exist. X-Forwarded-For is ignored, since
+    any client can set it.
+    """
+    if not settings.METRICS_ENABLED or not _metrics_allowed(
+        request.META.get("REMOTE_ADDR", "")
+    ):
+        return HttpResponseNotFound()
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+def record_cache_lookup(family, hit):
+    CACHE_LOOKUPS.labels(family=family, result="hit" if hit else "miss").inc()
+
+
+# Celery task run time, keyed by task id between prerun and postrun
+_task_started = {}
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_LATENCY.labels(task=task.name).observe(time.perf_counter() - started)
+    TASKS.labels(task=task.name, state=state or "UNKNOWN").inc()
+
+
+@worker_ready.connect
+def _on_worker_ready(**kwargs):
+    # Workers serve no HTTP, so they can expose their own metrics port
+    port = os.getenv("CELERY_METRICS_PORT")
+    if port:
+        start_http_server(int(port), registry=get_registry())
@@ -1,71 +1,136 @@
-import time
+import contextlib
 import json
-from loguru import logger
+import random
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
+from loguru import logger
+from . import metrics
+
+# Body keys whose names hint at a secret are listed as redacted
+SENSITIVE_FIELDS = ['password', 'token', 'secret', 'key']
+# At most this many body keys are listed per request
+MAX_BODY_KEYS = 20
 
 
 class LoggingMiddleware(MiddlewareMixin):
-    """Middleware to log all HTTP requests and responses."""
+    """
+    Middleware to log all HTTP requests and responses.
+
+    Each request produces one structured record when it completes. The
+    record is only built for requests that are actually logged (errors,
+    slow requests and a sample of the successful ones), and request bodies
+    are summarized by size and key names, never by value.
+    """
     
     def process_request(self, request):
-        """Log incoming requests."""
-        request.start_time = time.time()
-        
-        # Extract request information
-        user = getattr(request.user, 'username', 'anonymous') if hasattr(request, 'user') else 'anonymous'
-        method = request.method
-        path = request.get_full_path()
-        remote_addr = self.get_client_ip(request)
+        """Start timing the request."""
+        request.start_time = time.perf_counter()
         
-        # Log request body for POST/PUT/PATCH requests (excluding sensitive data)
-        request_body = ""
-        if method in ['POST', 'PUT', 'PATCH']:
+        # Small JSON bodies are read now, while the stream is still unread,
+        # so their keys can be summarized later; DRF reuses the cached body.
+        if (
+            request.method in ['POST', 'PUT', 'PATCH']
+            and request.content_type == 'application/json'
+            and 0 < self.get_content_length(request) <= settings.LOG_BODY_MAX_BYTES
+        ):
             try:
-                if hasattr(request, 'body') and request.body:
-                    # Try to parse JSON
-                    try:
-                        body_data = json.loads(request.body.decode('utf-8'))
-                        # Remove sensitive fields
-                        sensitive_fields = ['password', 'token', 'secret', 'key']
-                        filtered_body = {k: '***' if any(field in k.lower() for field in sensitive_fields) else v 
-                                       for k, v in body_data.items()}
-                        request_body = f" - Body: {json.dumps(filtered_body, default=str)}"
-                    except (json.JSONDecodeError, UnicodeDecodeError):
-                        request_body = f" - Body: [Binary/Non-JSON data, size: {len(request.body)} bytes]"
+                request.body
             except Exception:
-                request_body = " - Body: [Could not parse]"
-        
-        logger.info(f"→ {method} {path} - User: {user} - IP: {remote_addr}{request_body}")
+                pass
         
     def process_response(self, request, response):
-        """Log outgoing responses."""
+        """Log the completed request."""
         if not hasattr(request, 'start_time'):
             return response
             
-        # Calculate response time
-        response_time = (time.time() - request.start_time) * 1000  # in milliseconds
+        response_time = (time.perf_counter() - request.start_time) * 1000  # in milliseconds
+        status_code = response.status_code
+        
+        if not self.should_log(status_code, response_time):
+            return response
         
-        # Extract response information
-        user = getattr(request.user, 'username', 'anonymous') if hasattr(request, 'user') else 'anonymous'
         method = request.method
         path = request.get_full_path()
-        status_code = response.status_code
+        user = self.get_username(request)
         remote_addr = self.get_client_ip(request)
-        
-        # Log response
         log_level = self.get_log_level_for_status(status_code)
-        logger.log(log_level, f"← {method} {path} - User: {user} - IP: {remote_addr} - Status: {status_code} - Time: {response_time:.2f}ms")
+        
+        logger.bind(
+            access=True,
+            method=method,
+            path=path,
+            status=status_code,
+            duration_ms=round(response_time, 2),
+            user=user,
+            ip=remote_addr,
+            body=self.summarize_body(request),
+        ).log(
+            log_level,
+            "← {} {} - User: {} - IP: {} - Status: {} - Time: {:.2f}ms",
+            method, path, user, remote_addr, status_code, response_time,
+        )
         
         return response
         
     def process_exception(self, request, exception):
         """Log exceptions."""
-        user = getattr(request.user, 'username', 'anonymous') if hasattr(request, 'user') else 'anonymous'
         method = request.method
         path = request.get_full_path()
-        remote_addr = self.get_client_ip(request)
         
-        logger.error(f"✗ {method} {path} - User: {user} - IP: {remote_addr} - Exception: {str(exception)}")
+        logger.error(
+            "✗ {} {} - User: {} - IP: {} - Exception: {}",
+            method, path, self.get_username(request), self.get_client_ip(request), exception,
+        )
+        
+    def should_log(self, status_code, response_time):
+        """Errors and slow requests are always logged, other requests are sampled."""
+        if status_code >= 300 or response_time >= settings.LOG_SLOW_REQUEST_MS:
+            return True
+        return random.random() < settings.LOG_2XX_SAMPLE_RATE
+        
+    def summarize_body(self, request):
+        """
+        Summarize a request body as its size and top-level key names.
+        
+        Only bodies already read in process_request are parsed; anything
+        else (uploads, large or non-JSON bodies) is reported by size.
+        """
+        if request.method not in ['POST', 'PUT', 'PATCH']:
+            return None
+        
+        summary = {'size': self.get_content_length(request)}
+        body = getattr(request, '_body', None)
+        if body is None:
+            return summary
+        
+        try:
+            body_data = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return summary
+        
+        if isinstance(body_data, dict):
+            keys = list(body_data)
+            summary['keys'] = [
+                f"{k} (redacted)" if any(field in k.lower() for field in SENSITIVE_FIELDS) else k
+                for k in keys[:MAX_BODY_KEYS]
+            ]
+            if len(keys) > MAX_BODY_KEYS:
+                summary['more_keys'] = len(keys) - MAX_BODY_KEYS
+        return summary
+        
+    def get_content_length(self, request):
+        try:
+            return int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return 0
+        
+    def get_username(self, request):
+        user = getattr(request, 'user', None)
+        return getattr(user, 'username', '') or 'anonymous'
         
     def get_client_ip(self, request):
         """Get client IP address from request."""
@@ -85,4 +150,123 @@ class LoggingMiddleware(MiddlewareMixin):
         elif status_code >= 300:
             return "INFO"
         else:
-            return "INFO"
\ No newline at end of file
+            return "INFO"
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording per-view latency, response source and database
+    usage for the Prometheus metrics served on /metrics.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        queries = {"count": 0, "time": 0.0}
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries["count"] += 1
+                queries["time"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+
+        self.record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        # Async ORM queries run on worker threads, out of reach of an
+        # execute_wrapper installed here, so only latency is recorded
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, duration, queries=None):
+        view = self.get_view_name(request)
+        metrics.REQUEST_LATENCY.labels(view=view, method=request.method).observe(duration)
+        metrics.REQUESTS.labels(
+            view=view, method=request.method, status=response.status_code
+        ).inc()
+        source = response.get("X-Data-Source") if hasattr(response, "get") else None
+        if source:
+            metrics.RESPONSE_SOURCES.labels(view=view, source=source).inc()
+        if queries is not None:
+            metrics.REQUEST_QUERIES.labels(view=view).observe(queries["count"])
+            metrics.REQUEST_QUERY_TIME.labels(view=view).observe(queries["time"])
+
+    def get_view_name(self, request):
+        """Label requests by URL name so paths with IDs share one series."""
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return match.view_name or match.route
+
+
+class SQLProfilingMiddleware:
+    """
+    Opt-in middleware recording every SQL statement of an API request, with
+    its duration and the view or serializer line that issued it.
+
+    A request is profiled when it sends the ``X-Profile-SQL: 1`` header or
+    falls in the SQL_PROFILING_SAMPLE_RATE sample. Profiles are read back
+    with ``manage.py sql_profile_report``. Unless SQL_PROFILING_ENABLED is
+    set, Django drops the middleware at startup, so it costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        from .profiling import QueryRecorder, save_profile
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        try:
+            save_profile({
+                "method": request.method,
+                "path": request.path,
+                "view": (match.view_name or match.route) if match else "unmatched",
+                "status": response.status_code,
+                "ms": round(duration, 3),
+                "queries": recorder.queries,
+            })
+        except Exception as e:
+            logger.warning(f"Failed to store SQL profile for {request.path}: {str(e)}")
+
+        return response
+
+    def should_profile(self, request):
+        if not request.path.startswith("/api/"):
+            return False
+        if request.headers.get("X-Profile-SQL") == "1":
+            return True
+        return random.random() < settings.SQL_PROFILING_SAMPLE_RATE
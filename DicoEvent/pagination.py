@@ -0,0 +1,172 @@
+import base64
+import json
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) pagination over a queryset.
+
+    Unlike ``django.core.paginator.Paginator`` this never issues a COUNT(*)
+    or an OFFSET: each page is a range scan that starts right after the last
+    row of the previous page, so deep pages cost the same as the first one.
+    The ordering must be unique, so it should end with the primary key, and
+    should be backed by a matching composite index: every paginated model
+    declares one on ``(-created_at, -id)``, the default ordering.
+    """
+
+    def __init__(self, queryset, ordering=("-created_at", "-id"), page_size=10):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = ordering
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        """
+        Get the page that starts after the given cursor.
+
+        Args:
+            cursor: Opaque token returned as ``next_cursor`` by the previous
+                page, or None/empty for the first page
+
+        Returns:
+            tuple: (list of objects, next cursor or None on the last page)
+
+        Raises:
+            InvalidCursor: If the cursor is malformed
+        """
+        return self._split(list(self._window(cursor)))
+
+    async def apage(self, cursor=None):
+        """Async variant of ``page``."""
+        return self._split([obj async for obj in self._window(cursor)])
+
+    def _window(self, cursor):
+        """Rows of the page after ``cursor``, plus one to detect a next page."""
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        return queryset[: self.page_size + 1]
+
+    def _split(self, objects):
+        if len(objects) <= self.page_size:
+            return objects, None
+
+        objects = objects[: self.page_size]
+        return objects, self.encode_cursor(objects[-1])
+
+    def encode_cursor(self, obj):
+        """Build the opaque cursor pointing just after ``obj``."""
+        values = [self._field(name).value_to_string(obj) for name, _ in self._keys()]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Turn an opaque cursor back into typed ordering values."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            keys = self._keys()
+            if not isinstance(values, list) or len(values) != len(keys):
+                raise ValueError("Cursor does not match the ordering")
+            return [
+                self._field(name).to_python(value)
+                for (name, _), value in zip(keys, values)
+            ]
+        except (ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+    def _after(self, values):
+        """
+        Build the row-comparison filter ``(k1, k2, ...) > (v1, v2, ...)``
+        honouring each key's direction.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._keys(), values):
+            lookup = f"{name}__lt" if descending else f"{name}__gt"
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _keys(self):
+        return [(field.lstrip("-"), field.startswith("-")) for field in self.ordering]
+
+    def _field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+
+def keyset_page_data(
+    queryset,
+    cursor,
+    serializer_class,
+    key,
+    ordering=("-created_at", "-id"),
+    page_size=None,
+):
+    """
+    Serialize one keyset page into the list payload served by the API.
+
+    Args:
+        queryset: Rows to paginate
+        cursor: Cursor from the request, or None/empty for the first page
+        serializer_class: Serializer used for each row
+        key: Name of the list in the payload (e.g. "tickets")
+        ordering: Unique ordering the keyset follows
+        page_size: Rows per page, defaults to settings.LIST_PAGE_SIZE
+
+    Returns:
+        dict: The serialized rows under ``key`` plus pagination info
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    page_size = page_size or settings.LIST_PAGE_SIZE
+    paginator = KeysetPaginator(queryset, ordering=ordering, page_size=page_size)
+    objects, next_cursor = paginator.page(cursor)
+
+    return {
+        key: serializer_class(objects, many=True).data,
+        "pagination": {
+            "per_page": page_size,
+            "has_next": next_cursor is not None,
+            "next_cursor": next_cursor,
+        },
+    }
+
+
+def stream_ndjson(queryset, serializer_class, chunk_size=None):
+    """
+    Stream every row of a queryset as newline-delimited JSON.
+
+    List endpoints serve this instead of a page when the request opts in
+    with ``?stream=ndjson``. Rows are read through a server-side cursor in
+    chunks and serialized one at a time, so memory stays flat however large
+    the table is.
+
+    Args:
+        queryset: Rows to stream
+        serializer_class: Serializer used for each row
+        chunk_size: Rows fetched per round-trip, defaults to
+            settings.STREAM_CHUNK_SIZE
+
+    Returns:
+        StreamingHttpResponse: ``application/x-ndjson`` response
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    serializer = serializer_class()
+
+    def rows():
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield json.dumps(
+                serializer.to_representation(obj), cls=DjangoJSONEncoder
+            ) + "\n"
+
+    response = StreamingHttpResponse(rows(), content_type="application/x-ndjson")
+    response["X-Data-Source"] = "database"
+    return response
@@ -0,0 +1,116 @@
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from django.conf import settings
+from django_redis import get_redis_connection
+
+# Profiled requests are kept in this Redis list, newest first
+PROFILES_KEY = "sql_profiles"
+
+# Only frames from the project's own code are reported as query callers
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+_SKIPPED_FILES = (__file__, str(Path(__file__).with_name("middleware.py")))
+
+
+def _caller():
+    """Find the innermost project frame (view, serializer, ...) on the stack."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and filename not in _SKIPPED_FILES:
+            relative = filename[len(_PROJECT_DIR) + 1 :]
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording every statement of a request with
+    its duration and the project code that issued it.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": repr(params)[:500],
+                    "ms": round((time.perf_counter() - started) * 1000, 3),
+                    "caller": _caller(),
+                }
+            )
+
+
+def save_profile(profile):
+    """Store one profiled request, keeping the newest SQL_PROFILING_MAX_REQUESTS."""
+    redis = get_redis_connection("default")
+    pipeline = redis.pipeline()
+    pipeline.lpush(PROFILES_KEY, json.dumps(profile, default=str))
+    pipeline.ltrim(PROFILES_KEY, 0, settings.SQL_PROFILING_MAX_REQUESTS - 1)
+    pipeline.execute()
+
+
+def load_profiles():
+    """Get every stored profile, newest first."""
+    redis = get_redis_connection("default")
+    return [json.loads(profile) for profile in redis.lrange(PROFILES_KEY, 0, -1)]
+
+
+def clear_profiles():
+    get_redis_connection("default").delete(PROFILES_KEY)
+
+
+def normalize_sql(sql):
+    """Collapse literal values so statements differing only by value group together."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    sql = re.sub(r"%s", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def build_report(profiles):
+    """
+    Aggregate profiles into slow-statement and duplicate-query tables.
+
+    Returns:
+        dict: ``statements`` (per normalized statement: count, total and
+        max time, callers) and ``duplicates`` (the same statement with the
+        same parameters run more than once within one request)
+    """
+    statements = defaultdict(
+        lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "callers": set()}
+    )
+    duplicates = defaultdict(
+        lambda: {"requests": 0, "extra_queries": 0, "callers": set()}
+    )
+
+    for profile in profiles:
+        seen = defaultdict(list)
+        for query in profile["queries"]:
+            statement = normalize_sql(query["sql"])
+            stats = statements[statement]
+            stats["count"] += 1
+            stats["total_ms"] += query["ms"]
+            stats["max_ms"] = max(stats["max_ms"], query["ms"])
+            stats["callers"].add(query["caller"])
+            seen[(query["sql"], query["params"])].append(query["caller"])
+
+        for (sql, _), callers in seen.items():
+            if len(callers) > 1:
+                duplicate = duplicates[(profile["view"], normalize_sql(sql))]
+                duplicate["requests"] += 1
+                duplicate["extra_queries"] += len(callers) - 1
+                duplicate["callers"].update(callers)
+
+    return {"statements": statements, "duplicates": duplicates}
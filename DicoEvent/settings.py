@@ -29,7 +29,7 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "yes")
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host]
 
 
 # Application definition
@@ -49,9 +49,11 @@ INSTALLED_APPS = [
     "tickets.apps.TicketsConfig",
     "registrations.apps.RegistrationsConfig",
     "payments.apps.PaymentsConfig",
+    "DicoEvent",
 ]
 
 MIDDLEWARE = [
+    "DicoEvent.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -60,9 +62,11 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "DicoEvent.middleware.LoggingMiddleware",
+    "DicoEvent.middleware.SQLProfilingMiddleware",
 ]
 
-ROOT_URLCONF = "DicoEvent.urls"
+# asgi.py switches to DicoEvent.urls_asgi, which serves the hot reads with async views
+ROOT_URLCONF = os.getenv("DJANGO_ROOT_URLCONF", "DicoEvent.urls")
 
 TEMPLATES = [
     {
@@ -94,6 +98,9 @@ DATABASES = {
         "PASSWORD": os.getenv("DATABASE_PASSWORD"),
         "HOST": os.getenv("DATABASE_HOST"),
         "PORT": os.getenv("DATABASE_PORT"),
+        # Reuse connections across requests; each gunicorn thread keeps its own
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -140,10 +147,15 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Authorize from the role claims in the access token instead of loading the user
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "False").lower() in ("true", "1", "yes")
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication"
+        if JWT_STATELESS_AUTH
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
 }
 
@@ -165,6 +177,19 @@ MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
 MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minioadmin")
 MINIO_BUCKET_NAME = os.getenv("MINIO_BUCKET_NAME", "dicoevent-uploads")
 MINIO_USE_SSL = os.getenv("MINIO_USE_SSL", "False").lower() in ("true", "1", "yes")
+# Shared connection pool used for every MinIO call in a process
+MINIO_POOL_MAXSIZE = int(os.getenv("MINIO_POOL_MAXSIZE", "20"))
+MINIO_CONNECT_TIMEOUT = float(os.getenv("MINIO_CONNECT_TIMEOUT", "5"))
+MINIO_READ_TIMEOUT = float(os.getenv("MINIO_READ_TIMEOUT", "30"))
+# Multipart part size for uploads from disk (MinIO minimum is 5 MiB)
+MINIO_PART_SIZE = int(os.getenv("MINIO_PART_SIZE", str(10 * 1024 * 1024)))
+
+# Uploaded posters are spooled here until a worker moves them to MinIO.
+# Must be shared between the web and worker containers.
+POSTER_SPOOL_DIR = os.getenv("POSTER_SPOOL_DIR", str(BASE_DIR / "spool" / "posters"))
+POSTER_UPLOAD_MAX_RETRIES = int(os.getenv("POSTER_UPLOAD_MAX_RETRIES", "5"))
+# Lifetime of the presigned policies for direct-to-storage poster uploads
+POSTER_UPLOAD_POLICY_EXPIRES = int(os.getenv("POSTER_UPLOAD_POLICY_EXPIRES", "600"))
 
 # Redis Configuration
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -184,6 +209,40 @@ CACHES = {
 # Cache timeout (1 hour = 3600 seconds)
 CACHE_TTL = 3600
 
+# List endpoints: rows per keyset page, and rows per round-trip when streaming NDJSON
+LIST_PAGE_SIZE = 50
+STREAM_CHUNK_SIZE = 2000
+
+# Cross-request cache of user roles (group names), invalidated on membership changes
+ROLE_CACHE_ENABLED = os.getenv("ROLE_CACHE_ENABLED", "False").lower() in ("true", "1", "yes")
+ROLE_CACHE_TTL = CACHE_TTL
+
+# Transactional outbox: messages per relay transaction, and days published
+# messages are kept (the relay interval is OUTBOX_RELAY_INTERVAL, see celery.py)
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "500"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+
+# Waitlist entries promoted per transaction (the worker runs every
+# WAITLIST_PROMOTION_INTERVAL seconds, see celery.py)
+WAITLIST_PROMOTION_BATCH_SIZE = int(os.getenv("WAITLIST_PROMOTION_BATCH_SIZE", "200"))
+
+# Seconds a paid ticket's seat is held awaiting payment, and holds expired
+# per transaction (the sweeper runs every SEAT_HOLD_SWEEP_INTERVAL seconds,
+# see celery.py)
+SEAT_HOLD_TTL = int(os.getenv("SEAT_HOLD_TTL", "900"))
+SEAT_HOLD_SWEEP_BATCH_SIZE = int(os.getenv("SEAT_HOLD_SWEEP_BATCH_SIZE", "1000"))
+
+# Largest batch accepted by the bulk registration endpoint
+REGISTRATION_BULK_MAX = int(os.getenv("REGISTRATION_BULK_MAX", "5000"))
+
+# Live seat counters in Redis (Postgres holds the truth), and rows per
+# transaction when the reconciliation job repairs them
+SEAT_COUNTER_TTL = int(os.getenv("SEAT_COUNTER_TTL", str(24 * CACHE_TTL)))
+SEAT_RECONCILE_BATCH_SIZE = int(os.getenv("SEAT_RECONCILE_BATCH_SIZE", "500"))
+
+# Lifetime of presigned poster URLs; must outlive cached API responses
+POSTER_URL_EXPIRES = int(os.getenv("POSTER_URL_EXPIRES", str(2 * CACHE_TTL)))
+
 # Celery Configuration  
 REDIS_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_BROKER_URL = REDIS_URL
@@ -202,8 +261,30 @@ EMAIL_HOST_USER = os.getenv('MAIL_USER')
 EMAIL_HOST_PASSWORD = os.getenv('MAIL_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('MAIL_USER')
 
+# Attendees per reminder task; each task reuses one SMTP connection for its batch
+REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', '500'))
+# Seconds a claimed reminder may stay unsent before another run reclaims it
+# (its worker died or its batch was lost); must outlast sending a batch
+REMINDER_CLAIM_LEASE = int(os.getenv('REMINDER_CLAIM_LEASE', '600'))
+
 # Logging Configuration
 LOGGING_ENABLED = True
+# Share of successful (2xx) requests that are logged; errors are always logged
+LOG_2XX_SAMPLE_RATE = float(os.getenv('LOG_2XX_SAMPLE_RATE', '1.0'))
+# Requests slower than this are always logged, sampled or not
+LOG_SLOW_REQUEST_MS = float(os.getenv('LOG_SLOW_REQUEST_MS', '1000'))
+# Opt-in SQL profiling of API requests (X-Profile-SQL: 1 header or sampling),
+# reported by `manage.py sql_profile_report`
+SQL_PROFILING_ENABLED = os.getenv('SQL_PROFILING_ENABLED', 'False').lower() in ('true', '1', 'yes')
+SQL_PROFILING_SAMPLE_RATE = float(os.getenv('SQL_PROFILING_SAMPLE_RATE', '0'))
+SQL_PROFILING_MAX_REQUESTS = int(os.getenv('SQL_PROFILING_MAX_REQUESTS', '1000'))
+# JSON bodies up to this size are summarized (key names only) in request logs
+LOG_BODY_MAX_BYTES = int(os.getenv('LOG_BODY_MAX_BYTES', '65536'))
+
+# Prometheus /metrics: served only to these client addresses or networks
+# (comma-separated, matched against REMOTE_ADDR), or not at all when disabled
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
 
 # Import and configure Loguru
 from .logging_config import configure_logging, get_logger
@@ -0,0 +1,121 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from events.models import Event
+from registrations.models import Registration
+from tickets.models import Ticket
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for guarding endpoints against N+1 regressions.
+
+    Unlike ``assertNumQueries`` it asserts an upper bound, so a budget can be
+    written once per endpoint and checked against any number of rows:
+
+        class RegistrationsViewTests(QueryBudgetMixin, APITestCase):
+            def test_list_query_budget(self):
+                ...create 10_000 registrations...
+                with self.assertMaxQueries(3):
+                    self.client.get("/api/registrations/")
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = "\n".join(
+                f"{i}. {query['sql']}"
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f"{executed} queries executed, query budget is {budget}\n"
+                f"Captured queries were:\n{queries}"
+            )
+
+
+# Factories shared by the apps' tests. Bulk ones skip signals and save(),
+# like the bulk paths of the API, so they build large data sets quickly.
+
+
+def create_users(count, prefix="user", with_email=False):
+    """Create ``count`` users named ``<prefix><n>``."""
+    User = get_user_model()
+    return User.objects.bulk_create(
+        [
+            User(
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@example.com" if with_email else None,
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def _event(organizer, start_time=None, **fields):
+    start_time = start_time or timezone.now() + timedelta(days=7)
+    values = {
+        "name": "Test Event",
+        "description": "Event created by the tests",
+        "location": "Hall A",
+        "start_time": start_time,
+        "end_time": start_time + timedelta(hours=2),
+        "quota": 100,
+        "category": "tech",
+        **fields,
+    }
+    return Event(organizer=organizer, **values)
+
+
+def create_event(organizer, start_time=None, **fields):
+    """Create an event a week from now, unless ``start_time`` says otherwise."""
+    event = _event(organizer, start_time, **fields)
+    event.save()
+    return event
+
+
+def create_events(organizers, start_time=None, **fields):
+    """Create one event per organizer given (repeat one for several events)."""
+    return Event.objects.bulk_create(
+        [
+            _event(organizer, start_time, name=f"Event {i}", **fields)
+            for i, organizer in enumerate(organizers)
+        ]
+    )
+
+
+def _ticket(event, **fields):
+    values = {
+        "name": "Regular",
+        "price": 10,
+        "sales_start": timezone.now() - timedelta(days=1),
+        "sales_end": event.start_time,
+        "quota": 100,
+        **fields,
+    }
+    return Ticket(event=event, **values)
+
+
+def create_ticket(event, **fields):
+    """Create a ticket on sale until the event starts."""
+    ticket = _ticket(event, **fields)
+    ticket.save()
+    return ticket
+
+
+def create_tickets(events, **fields):
+    """Create one ticket per event given."""
+    return Ticket.objects.bulk_create([_ticket(event, **fields) for event in events])
+
+
+def create_registrations(ticket, users, **fields):
+    """Register every user given for a ticket, without reserving seats."""
+    return Registration.objects.bulk_create(
+        [Registration(ticket=ticket, user=user, **fields) for user in users]
+    )
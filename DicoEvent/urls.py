@@ -17,6 +17,7 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
+from .metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -28,4 +29,5 @@ urlpatterns = [
     path("api/tickets/", include("tickets.urls")),
     path("api/registrations/", include("registrations.urls")),
     path("api/payments/", include("payments.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,35 @@
+"""
+URL configuration used when serving over ASGI (see asgi.py).
+
+The hot read endpoints are routed to async views; they come first so they
+take precedence over the sync DRF views in DicoEvent.urls, which still
+serve everything else.
+"""
+
+from django.urls import path
+from events.async_views import (
+    AsyncEventDetailView,
+    AsyncEventPosterView,
+    AsyncEventsView,
+)
+from tickets.async_views import AsyncTicketDetailView
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/events/", AsyncEventsView.as_view(), name="events"),
+    path(
+        "api/events/<uuid:event_id>/",
+        AsyncEventDetailView.as_view(),
+        name="event_detail",
+    ),
+    path(
+        "api/events/<uuid:event_id>/poster/",
+        AsyncEventPosterView.as_view(),
+        name="event_poster",
+    ),
+    path(
+        "api/tickets/<uuid:ticket_id>/",
+        AsyncTicketDetailView.as_view(),
+        name="ticket_detail",
+    ),
+] + sync_urlpatterns
@@ -0,0 +1,200 @@
+from asgiref.sync import sync_to_async
+from loguru import logger
+from DicoEvent import cache as async_cache
+from DicoEvent.async_views import AsyncReadView, json_response
+from DicoEvent.pagination import InvalidCursor, KeysetPaginator
+from registrations.services import seat_availability
+from .images import POSTER_SIZES, pick_poster_variant
+from .models import Event
+from .serializers import EventListSerializer
+from .services import minio_service
+from .cache import events_list_cache
+from .views import EventDetailView, EventPosterView, EventsView
+
+
+def _serialize_events(events, many=True):
+    # Serializing may sign poster URLs (sync cache and storage calls)
+    return EventListSerializer(events, many=many).data
+
+
+class AsyncEventsView(AsyncReadView):
+    """Async GET /api/events/ with the same payloads and caching as EventsView."""
+
+    write_view = EventsView
+
+    async def get(self, request):
+        page_number = request.GET.get("page", 1)
+        logger.info(f"GET /events (async) - Page: {page_number}")
+
+        # Opt-in keyset mode: ?cursor= (empty for the first page)
+        if "cursor" in request.GET:
+            return await self._get_keyset_page(request)
+
+        page_size = 10  # Events per page
+
+        try:
+            cache_key = f"page_{page_number}"
+            cached_data = await events_list_cache.aget(cache_key)
+            if cached_data:
+                logger.info(f"Events list page {page_number} served from cache")
+                await seat_availability.aoverlay("event", cached_data["events"])
+                return json_response(cached_data, source="cache")
+
+            events = Event.objects.select_related("organizer").order_by("-created_at")
+            total = await events.acount()
+            pages = max(1, -(-total // page_size))
+
+            # Same fallbacks as django.core.paginator in the sync view
+            try:
+                number = int(page_number)
+            except (TypeError, ValueError):
+                number = 1
+                logger.warning(
+                    f"Invalid page number '{page_number}', defaulting to page 1"
+                )
+            if number < 1 or number > pages:
+                logger.warning(
+                    f"Page {page_number} is empty, serving last page {pages}"
+                )
+                number = pages
+
+            offset = (number - 1) * page_size
+            page = [event async for event in events[offset : offset + page_size]]
+
+            data = {
+                "events": await sync_to_async(_serialize_events)(page),
+                "pagination": {
+                    "page": number,
+                    "pages": pages,
+                    "per_page": page_size,
+                    "total": total,
+                    "has_next": number < pages,
+                    "has_previous": number > 1,
+                    "next_page": number + 1 if number < pages else None,
+                    "previous_page": number - 1 if number > 1 else None,
+                },
+            }
+
+            await events_list_cache.aset(cache_key, data)
+            logger.info(
+                f"Events list page {page_number} cached successfully - Total events: {total}"
+            )
+
+            return json_response(data, source="database")
+
+        except Exception as e:
+            logger.error(f"Error retrieving events list: {str(e)}")
+            return json_response({"error": "Failed to retrieve events"}, status=500)
+
+    async def _get_keyset_page(self, request):
+        """Serve one page in keyset mode, without COUNT(*) or OFFSET."""
+        cursor = request.GET.get("cursor")
+        page_size = 10  # Events per page
+
+        cache_key = f"cursor_{cursor}"
+        cached_data = await events_list_cache.aget(cache_key)
+        if cached_data:
+            await seat_availability.aoverlay("event", cached_data["events"])
+            return json_response(cached_data, source="cache")
+
+        try:
+            paginator = KeysetPaginator(
+                Event.objects.select_related("organizer"), page_size=page_size
+            )
+            page, next_cursor = await paginator.apage(cursor)
+            data = {
+                "events": await sync_to_async(_serialize_events)(page),
+                "pagination": {
+                    "per_page": page_size,
+                    "has_next": next_cursor is not None,
+                    "next_cursor": next_cursor,
+                },
+            }
+        except InvalidCursor:
+            logger.warning(f"Invalid events cursor '{cursor}'")
+            return json_response({"detail": "Invalid cursor."}, status=400)
+        except Exception as e:
+            logger.error(f"Error retrieving events list: {str(e)}")
+            return json_response({"error": "Failed to retrieve events"}, status=500)
+
+        await events_list_cache.aset(cache_key, data)
+        return json_response(data, source="database")
+
+
+class AsyncEventDetailView(AsyncReadView):
+    """Async GET /api/events/<id>/ with the same payload and cache as EventDetailView."""
+
+    write_view = EventDetailView
+
+    async def get(self, request, event_id):
+        cache_key = f"event_detail_{event_id}"
+        cached_data = await async_cache.aget(cache_key)
+        if cached_data:
+            await seat_availability.aoverlay("event", [cached_data])
+            return json_response(cached_data, source="cache")
+
+        event = (
+            await Event.objects.select_related("organizer").filter(id=event_id).afirst()
+        )
+        if event is None:
+            return json_response({"detail": "Event not found."}, status=404)
+
+        data = await sync_to_async(_serialize_events)(event, many=False)
+        await async_cache.aset(cache_key, data)
+
+        return json_response(data, source="database")
+
+
+class AsyncEventPosterView(AsyncReadView):
+    """Async GET /api/events/<id>/poster/ with the same payload as EventPosterView."""
+
+    write_view = EventPosterView
+
+    async def get(self, request, event_id):
+        size = request.GET.get("size", "original")
+        if size != "original" and size not in POSTER_SIZES:
+            return json_response(
+                {
+                    "detail": f"Invalid size. Allowed sizes: original, {', '.join(POSTER_SIZES)}"
+                },
+                status=400,
+            )
+
+        event = (
+            await Event.objects.only("id", "poster", "poster_status", "poster_variants")
+            .filter(id=event_id)
+            .afirst()
+        )
+        if event is None:
+            return json_response({"detail": "Event not found."}, status=404)
+
+        if not event.poster:
+            if event.poster_status == "pending":
+                return json_response(
+                    {"detail": "Event poster is being processed."}, status=404
+                )
+            return json_response({"detail": "Event poster not found."}, status=404)
+
+        filename, served_size, served_format = pick_poster_variant(
+            event, size, request.GET.get("image_format")
+        )
+
+        try:
+            poster_url = await minio_service.aget_cached_file_url(
+                filename, folder="event-posters"
+            )
+        except Exception as e:
+            return json_response(
+                {"error": f"Failed to generate poster URL: {str(e)}"}, status=500
+            )
+
+        return json_response(
+            {
+                "event_id": str(event.id),
+                "poster_url": poster_url,
+                "filename": filename,
+                "size": served_size,
+                "format": served_format,
+                "poster_status": event.poster_status,
+            }
+        )
@@ -0,0 +1,4 @@
+from DicoEvent.cache import CacheNamespace
+
+# Every list page (page-number and cursor mode) lives in this namespace
+events_list_cache = CacheNamespace("events_list")
@@ -0,0 +1,82 @@
+import io
+import os
+from PIL import Image, ImageOps, features
+
+# Poster variants: name -> bounding box the image is scaled down to fit
+POSTER_SIZES = {
+    "thumb": (320, 320),
+    "medium": (960, 960),
+}
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+# Encoder options per format, tuned for photos viewed on screen
+SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 60},
+}
+
+
+def available_formats():
+    """Get the variant formats this Pillow build can encode, best first."""
+    formats = []
+    if features.check("avif"):
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    return formats
+
+
+def variant_filename(filename, size, fmt):
+    """Build the storage name of a poster variant from the original's name."""
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}_{size}.{fmt}"
+
+
+def render_variants(data, filename):
+    """
+    Render every size and format variant of a poster.
+
+    Args:
+        data: Bytes of the original image
+        filename: Storage name of the original image
+
+    Returns:
+        list: (size, format, variant filename, encoded bytes) tuples
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        # Respect camera orientation and keep only the first frame
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    variants = []
+    for size, box in POSTER_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        for fmt in available_formats():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+            variants.append(
+                (size, fmt, variant_filename(filename, size, fmt), buffer.getvalue())
+            )
+    return variants
+
+
+def pick_poster_variant(event, size, image_format=None):
+    """
+    Choose the stored file to serve for the requested poster size.
+
+    WebP is served unless the client asks for another format that was
+    rendered. Until the variants are rendered the original is served.
+
+    Returns:
+        tuple: (filename, size served, format served or None for the original)
+    """
+    variants = event.poster_variants.get(size, {}) if size != "original" else {}
+    for fmt in (image_format, "webp"):
+        if fmt in variants:
+            return variants[fmt], size, fmt
+    return event.poster, "original", None
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from events.models import Event
+from events.schedule import reminder_schedule
+
+
+class Command(BaseCommand):
+    help = "Rebuild the reminder schedule from the events in the database"
+
+    def handle(self, *args, **options):
+        count = reminder_schedule.rebuild(Event.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Scheduled reminders for {count} events"))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_poster"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="sold",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_sold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="event_created_id_idx"
+            ),
+        ),
+    ]
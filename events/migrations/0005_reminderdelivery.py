@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0002_registration_registration_created_id_idx"),
+        ("events", "0004_event_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderDelivery",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("event_starting", "Event starting soon")],
+                        max_length=30,
+                    ),
+                ),
+                ("claim_token", models.UUIDField(blank=True, db_index=True, null=True)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "registration",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reminder_deliveries",
+                        to="registrations.registration",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("registration", "kind")},
+            },
+        ),
+    ]
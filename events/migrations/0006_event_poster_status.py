@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_reminderdelivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="poster_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_event_poster_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="poster_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
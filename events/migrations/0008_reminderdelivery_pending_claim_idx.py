@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_event_poster_variants"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reminderdelivery",
+            index=models.Index(
+                condition=models.Q(
+                    ("claim_token__isnull", False), ("sent_at__isnull", True)
+                ),
+                fields=["claimed_at"],
+                name="reminder_pending_claim_idx",
+            ),
+        ),
+    ]
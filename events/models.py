@@ -1,5 +1,10 @@
-from django.db import models
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 import uuid
 
 User = get_user_model()
@@ -12,6 +17,11 @@ class Event(models.Model):
         ("completed", "Completed"),
         ("cancelled", "Cancelled"),
     ]
+    POSTER_STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
@@ -23,11 +33,17 @@ class Event(models.Model):
         max_length=20, choices=STATUS_CHOICES, default="scheduled"
     )
     quota = models.PositiveIntegerField()
+    sold = models.PositiveIntegerField(default=0)
     category = models.CharField(max_length=100)
     organizer = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="organized_events"
     )
     poster = models.CharField(max_length=255, blank=True, null=True)
+    poster_status = models.CharField(
+        max_length=20, choices=POSTER_STATUS_CHOICES, blank=True, null=True
+    )
+    # Resized copies of the poster: {size: {format: filename}}
+    poster_variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -36,3 +52,123 @@ class Event(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="event_created_id_idx"),
+        ]
+
+
+@receiver(post_save, sender=Event)
+def handle_saved_event(sender, instance, **kwargs):
+    """
+    Schedule the event's reminder, or move or cancel it when the start time
+    or status changed.
+    """
+    from .schedule import reminder_schedule
+
+    transaction.on_commit(lambda: reminder_schedule.schedule(instance))
+
+
+@receiver(post_delete, sender=Event)
+def handle_deleted_event(sender, instance, **kwargs):
+    """
+    Cancel the reminder of a deleted event.
+    """
+    from .schedule import reminder_schedule
+
+    event_id = instance.id
+    transaction.on_commit(lambda: reminder_schedule.cancel(event_id))
+
+
+class ReminderDeliveryManager(models.Manager):
+    def _lease_expired_before(self):
+        return timezone.now() - timedelta(seconds=settings.REMINDER_CLAIM_LEASE)
+
+    def claim(self, registrations, kind):
+        """
+        Claim the reminders of the given registrations that no run has
+        claimed yet, or whose claim outlived REMINDER_CLAIM_LEASE unsent.
+
+        Missing ledger rows are created first, then every claimable row is
+        stamped with a fresh claim token in a single conditional UPDATE.
+        Concurrent or overlapping runs re-check the condition under the row
+        lock, so each reminder is claimed by exactly one of them.
+
+        Args:
+            registrations: Queryset of registrations to remind
+            kind: Reminder kind (one of ReminderDelivery.KIND_CHOICES)
+
+        Returns:
+            QuerySet: The deliveries claimed by this call
+        """
+        new_ids = list(
+            registrations.exclude(reminder_deliveries__kind=kind).values_list(
+                "id", flat=True
+            )
+        )
+        for start in range(0, len(new_ids), 1000):
+            self.bulk_create(
+                [
+                    self.model(registration_id=registration_id, kind=kind)
+                    for registration_id in new_ids[start : start + 1000]
+                ],
+                ignore_conflicts=True,
+            )
+
+        claim_token = uuid.uuid4()
+        self.filter(
+            models.Q(claim_token__isnull=True)
+            | models.Q(claimed_at__lt=self._lease_expired_before()),
+            registration__in=registrations,
+            kind=kind,
+            sent_at__isnull=True,
+        ).update(claim_token=claim_token, claimed_at=timezone.now())
+        return self.filter(claim_token=claim_token)
+
+    def abandoned(self, kind):
+        """
+        Get the unsent reminders whose claim outlived the lease, whether the
+        run holding it was lost or its delivery failed.
+        """
+        return self.filter(
+            kind=kind,
+            sent_at__isnull=True,
+            claim_token__isnull=False,
+            claimed_at__lt=self._lease_expired_before(),
+        )
+
+
+class ReminderDelivery(models.Model):
+    """Ledger of reminder emails, one row per registration and reminder kind."""
+
+    EVENT_STARTING = "event_starting"
+    KIND_CHOICES = [
+        (EVENT_STARTING, "Event starting soon"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    registration = models.ForeignKey(
+        "registrations.Registration",
+        on_delete=models.CASCADE,
+        related_name="reminder_deliveries",
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    claim_token = models.UUIDField(blank=True, null=True, db_index=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ReminderDeliveryManager()
+
+    def __str__(self):
+        return f"{self.kind} reminder for registration {self.registration_id}"
+
+    class Meta:
+        unique_together = ["registration", "kind"]  # One reminder of each kind
+        indexes = [
+            # Lets the dispatcher find abandoned claims without a ledger scan
+            models.Index(
+                fields=["claimed_at"],
+                name="reminder_pending_claim_idx",
+                condition=models.Q(sent_at__isnull=True, claim_token__isnull=False),
+            ),
+        ]
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from django_redis import get_redis_connection
+from loguru import logger
+
+# Reminders go out this long before an event starts
+REMINDER_LEAD_TIME = timedelta(hours=2)
+
+
+class ReminderSchedule:
+    """
+    Precomputed reminder times for upcoming events.
+
+    Each scheduled event is a member of a Redis sorted set scored by the
+    epoch second its reminder is due. Events are (re)scheduled whenever they
+    are saved and dropped when they are deleted, so finding the reminders
+    that are due is a range read on the set instead of a scan of the events
+    table.
+    """
+
+    key = "event_reminder_schedule"
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    def due_at(self, event):
+        """Get the moment the reminder for an event is due."""
+        return event.start_time - REMINDER_LEAD_TIME
+
+    def schedule(self, event):
+        """
+        Schedule, move or cancel the reminder of an event after it changed.
+
+        Only scheduled events that have not started yet keep a reminder.
+        """
+        if event.status != "scheduled" or event.start_time <= timezone.now():
+            self.cancel(event.id)
+            return
+
+        self._redis().zadd(self.key, {str(event.id): self.due_at(event).timestamp()})
+
+    def cancel(self, event_id):
+        """Drop the reminder of an event, if it has one."""
+        self._redis().zrem(self.key, str(event_id))
+
+    def pop_due(self, now=None, limit=1000):
+        """
+        Take the events whose reminder is due.
+
+        Members are removed one by one and only those this call actually
+        removed are returned, so concurrent dispatchers never both take the
+        same event. Whatever the caller fails to dispatch must be given
+        back with ``restore``.
+
+        Args:
+            now: Reference time, defaults to the current time
+            limit: Maximum number of events taken at once
+
+        Returns:
+            list: (event ID, epoch second the reminder was due) pairs
+        """
+        now = now or timezone.now()
+        redis = self._redis()
+        entries = redis.zrangebyscore(
+            self.key, "-inf", now.timestamp(), start=0, num=limit, withscores=True
+        )
+        if not entries:
+            return []
+
+        pipeline = redis.pipeline()
+        for member, _ in entries:
+            pipeline.zrem(self.key, member)
+        removed = pipeline.execute()
+
+        return [
+            (member.decode() if isinstance(member, bytes) else member, due_at)
+            for (member, due_at), taken in zip(entries, removed)
+            if taken
+        ]
+
+    def restore(self, entries):
+        """
+        Put back reminders taken by ``pop_due`` that could not be dispatched,
+        with their original due time. Events rescheduled in the meantime
+        keep their new time.
+
+        Args:
+            entries: (event ID, epoch second the reminder was due) pairs
+        """
+        if entries:
+            self._redis().zadd(
+                self.key,
+                {str(event_id): due_at for event_id, due_at in entries},
+                nx=True,
+            )
+
+    def next_due(self):
+        """Get when the next reminder is due, or None if none is scheduled."""
+        entries = self._redis().zrange(self.key, 0, 0, withscores=True)
+        if not entries:
+            return None
+        return datetime.fromtimestamp(entries[0][1], tz=dt_timezone.utc)
+
+    def rebuild(self, events):
+        """
+        Replace the whole schedule with the reminders of the given events.
+
+        Args:
+            events: Queryset of events to schedule
+
+        Returns:
+            int: Number of reminders scheduled
+        """
+        redis = self._redis()
+        redis.delete(self.key)
+
+        now = timezone.now()
+        count = 0
+        pipeline = redis.pipeline()
+        for event_id, start_time in (
+            events.filter(status="scheduled", start_time__gt=now)
+            .values_list("id", "start_time")
+            .iterator(chunk_size=2000)
+        ):
+            pipeline.zadd(
+                self.key, {str(event_id): (start_time - REMINDER_LEAD_TIME).timestamp()}
+            )
+            count += 1
+            if count % 2000 == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        logger.info(f"Rebuilt reminder schedule with {count} events")
+        return count
+
+
+# Global instance
+reminder_schedule = ReminderSchedule()
@@ -1,12 +1,35 @@
+import io
+import os
+import re
+import uuid
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from PIL import Image
+from loguru import logger
 from .models import Event
 from .services import minio_service
 
+
+def _poster_upload_key(filename):
+    return f"poster_upload_{filename}"
+
 User = get_user_model()
 
+# Constraints every event poster must meet, however it is uploaded
+POSTER_MAX_SIZE = 500 * 1024  # 500KB in bytes
+POSTER_CONTENT_TYPES = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
+# Extension and PIL format expected for each accepted content type
+POSTER_FORMATS = {
+    'image/jpeg': ('.jpg', 'JPEG'),
+    'image/jpg': ('.jpg', 'JPEG'),
+    'image/png': ('.png', 'PNG'),
+    'image/gif': ('.gif', 'GIF'),
+    'image/webp': ('.webp', 'WEBP'),
+}
+
 
 class EventCreateSerializer(serializers.ModelSerializer):
     organizer_id = serializers.UUIDField(write_only=True)
@@ -52,8 +75,19 @@ class EventCreateSerializer(serializers.ModelSerializer):
         }
 
 
+class EventListListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        """Sign (or fetch from cache) the poster URLs of the whole page at once."""
+        events = list(data.all() if hasattr(data, "all") else data)
+        self.child.poster_urls = self.child.get_poster_urls(events)
+        return super().to_representation(events)
+
+
 class EventListSerializer(serializers.ModelSerializer):
     organizer = serializers.SerializerMethodField()
+    remaining = serializers.SerializerMethodField()
+    poster_url = serializers.SerializerMethodField()
+    poster_thumbnail_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
@@ -66,15 +100,59 @@ class EventListSerializer(serializers.ModelSerializer):
             "end_time",
             "status",
             "quota",
+            "sold",
+            "remaining",
             "category",
             "organizer",
+            "poster_url",
+            "poster_thumbnail_url",
             "created_at",
             "updated_at",
         ]
+        list_serializer_class = EventListListSerializer
 
     def get_organizer(self, obj):
         return {"id": str(obj.organizer.id), "username": obj.organizer.username}
 
+    def get_remaining(self, obj):
+        return max(obj.quota - obj.sold, 0)
+
+    def get_poster_urls(self, events):
+        """Get the poster and thumbnail URLs of every event that has a poster."""
+        filenames = [event.poster for event in events if event.poster]
+        filenames += [
+            thumbnail for thumbnail in map(self._thumbnail_filename, events) if thumbnail
+        ]
+        if not filenames:
+            return {}
+        try:
+            return minio_service.get_cached_file_urls(filenames, folder="event-posters")
+        except Exception as e:
+            # A storage outage must not take the event list down with it
+            logger.error(f"Failed to get poster URLs: {str(e)}")
+            return {}
+
+    def get_poster_url(self, obj):
+        if not obj.poster:
+            return None
+        poster_urls = getattr(self, "poster_urls", None)
+        if poster_urls is None:
+            poster_urls = self.get_poster_urls([obj])
+        return poster_urls.get(obj.poster)
+
+    def get_poster_thumbnail_url(self, obj):
+        thumbnail = self._thumbnail_filename(obj)
+        if not thumbnail:
+            return None
+        poster_urls = getattr(self, "poster_urls", None)
+        if poster_urls is None:
+            poster_urls = self.get_poster_urls([obj])
+        return poster_urls.get(thumbnail)
+
+    def _thumbnail_filename(self, obj):
+        # WebP is the format every client renders
+        return (obj.poster_variants or {}).get("thumb", {}).get("webp")
+
     def to_representation(self, instance):
         return {
             "id": str(instance.id),
@@ -85,8 +163,12 @@ class EventListSerializer(serializers.ModelSerializer):
             "end_time": instance.end_time.isoformat(),
             "status": instance.status,
             "quota": instance.quota,
+            "sold": instance.sold,
+            "remaining": self.get_remaining(instance),
             "category": instance.category,
             "organizer": self.get_organizer(instance),
+            "poster_url": self.get_poster_url(instance),
+            "poster_thumbnail_url": self.get_poster_thumbnail_url(instance),
             "created_at": instance.created_at.isoformat(),
             "updated_at": instance.updated_at.isoformat(),
         }
@@ -136,17 +218,15 @@ class EventPosterUploadSerializer(serializers.Serializer):
     def validate_image(self, value):
         """Validate image file type and size."""
         # Check file size (max 500KB)
-        max_size = 500 * 1024  # 500KB in bytes
-        if value.size > max_size:
+        if value.size > POSTER_MAX_SIZE:
             raise serializers.ValidationError(
                 f"File size too large. Maximum size is 500KB. Current size: {value.size / 1024:.1f}KB"
             )
 
         # Check MIME type
-        allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
-        if value.content_type not in allowed_types:
+        if value.content_type not in POSTER_CONTENT_TYPES:
             raise serializers.ValidationError(
-                f"Invalid file type. Allowed types: {', '.join(allowed_types)}"
+                f"Invalid file type. Allowed types: {', '.join(POSTER_CONTENT_TYPES)}"
             )
 
         # Validate image using PIL
@@ -167,26 +247,164 @@ class EventPosterUploadSerializer(serializers.Serializer):
             raise serializers.ValidationError("Event not found.")
 
     def create(self, validated_data):
-        """Upload image to MinIO and return the result.""" 
+        """
+        Spool the image to disk and queue its upload to MinIO.
+
+        The event keeps its current poster until the worker has uploaded the
+        new one, then ``poster_status`` turns ``ready`` (or ``failed``).
+        """
+        from .tasks import upload_event_poster
+
         image = validated_data['image']
         event_id = validated_data['event']
         
         try:
-            # Get the event object
-            event = Event.objects.get(id=event_id)
+            file_extension = os.path.splitext(image.name)[1].lower()
+            filename = f"{uuid.uuid4()}{file_extension}"
             
-            # Upload to MinIO
-            filename = minio_service.upload_file(image, folder="event-posters")
+            # Spool to disk so the request thread never waits on MinIO
+            os.makedirs(settings.POSTER_SPOOL_DIR, exist_ok=True)
+            spool_path = os.path.join(settings.POSTER_SPOOL_DIR, filename)
+            image.seek(0)
+            with open(spool_path, 'wb') as spool_file:
+                for chunk in image.chunks():
+                    spool_file.write(chunk)
             
-            # Save poster filename to event
-            event.poster = filename
-            event.save()
+            Event.objects.filter(id=event_id).update(poster_status='pending')
+            upload_event_poster.delay(
+                str(event_id), spool_path, filename, image.content_type
+            )
             
             return {
                 'id': str(event_id),
-                'image': filename
+                'image': filename,
+                'poster_status': 'pending'
             }
-        except ValidationError as e:
-            raise serializers.ValidationError(str(e))
         except Exception as e:
             raise serializers.ValidationError(f"Upload failed: {str(e)}")
+
+
+class EventPosterPresignSerializer(serializers.Serializer):
+    event = serializers.UUIDField(required=True)
+    content_type = serializers.ChoiceField(choices=POSTER_CONTENT_TYPES)
+
+    def validate_event(self, value):
+        """Validate that event exists."""
+        if not Event.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Event not found.")
+        return value
+
+    def create(self, validated_data):
+        """Reserve a poster filename and sign a direct upload policy for it."""
+        content_type = validated_data['content_type']
+        extension, _ = POSTER_FORMATS[content_type]
+        filename = f"{uuid.uuid4()}{extension}"
+        expires = settings.POSTER_UPLOAD_POLICY_EXPIRES
+
+        try:
+            upload = minio_service.get_upload_policy(
+                filename,
+                folder="event-posters",
+                content_type=content_type,
+                max_size=POSTER_MAX_SIZE,
+                expires=expires,
+            )
+        except ValidationError as e:
+            raise serializers.ValidationError(str(e))
+
+        # Only this event may claim the upload; an upload finished just
+        # before the policy expired can still be confirmed for as long again
+        cache.set(
+            _poster_upload_key(filename), str(validated_data['event']), timeout=2 * expires
+        )
+
+        return {
+            'id': str(validated_data['event']),
+            'image': filename,
+            'upload_url': upload['url'],
+            'fields': upload['fields'],
+            'expires_in': expires,
+        }
+
+
+class EventPosterConfirmSerializer(serializers.Serializer):
+    event = serializers.UUIDField(required=True)
+    image = serializers.CharField(required=True)
+
+    def validate_event(self, value):
+        """Validate that event exists."""
+        if not Event.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Event not found.")
+        return value
+
+    def validate_image(self, value):
+        """Only names handed out by the presign endpoint are accepted."""
+        extensions = "|".join(sorted({ext.lstrip('.') for ext, _ in POSTER_FORMATS.values()}))
+        if not re.fullmatch(rf"[0-9a-f\-]{{36}}\.({extensions})", value):
+            raise serializers.ValidationError("Invalid poster filename.")
+        return value
+
+    def validate(self, attrs):
+        """Check the uploaded object without downloading it."""
+        filename = attrs['image']
+        if cache.get(_poster_upload_key(filename)) != str(attrs['event']):
+            raise serializers.ValidationError(
+                {'image': "Poster was not presigned for this event, or the upload expired."}
+            )
+
+        try:
+            stat = minio_service.stat_file(filename, folder="event-posters")
+            if stat is None:
+                raise serializers.ValidationError({'image': "Poster has not been uploaded."})
+
+            errors = None
+            if stat.size > POSTER_MAX_SIZE:
+                errors = f"File size too large. Maximum size is 500KB. Current size: {stat.size / 1024:.1f}KB"
+            elif stat.content_type not in POSTER_CONTENT_TYPES:
+                errors = f"Invalid file type. Allowed types: {', '.join(POSTER_CONTENT_TYPES)}"
+            elif not self._header_matches(filename, stat.content_type):
+                errors = "Invalid image file or corrupted image."
+
+            if errors:
+                # Nothing will ever reference a rejected upload
+                minio_service.delete_file(filename, folder="event-posters")
+                raise serializers.ValidationError({'image': errors})
+        except ValidationError as e:
+            raise serializers.ValidationError(str(e))
+
+        return attrs
+
+    def _header_matches(self, filename, content_type):
+        """Sniff the image header from the first bytes of the object."""
+        _, expected_format = POSTER_FORMATS[content_type]
+        head = minio_service.read_file_head(filename, folder="event-posters")
+        try:
+            with Image.open(io.BytesIO(head)) as image:
+                return image.format == expected_format
+        except Exception:
+            return False
+
+    def create(self, validated_data):
+        """Attach the uploaded poster to the event and drop the one it replaces."""
+        from .tasks import delete_poster_files, generate_poster_variants
+
+        event_id = str(validated_data['event'])
+        filename = validated_data['image']
+
+        # Each presigned upload is attached once
+        if not cache.delete(_poster_upload_key(filename)):
+            raise serializers.ValidationError({'image': "Poster was already confirmed."})
+
+        previous = Event.objects.filter(id=event_id).values('poster', 'poster_variants').first()
+        Event.objects.filter(id=event_id).update(
+            poster=filename, poster_status='ready', poster_variants={}
+        )
+        generate_poster_variants.delay(event_id, filename)
+        if previous and previous['poster']:
+            delete_poster_files.delay(previous['poster'], previous['poster_variants'])
+
+        return {
+            'id': event_id,
+            'image': filename,
+            'poster_status': 'ready'
+        }
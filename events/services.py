@@ -1,31 +1,82 @@
+import io
 import os
+import threading
 import uuid
 from datetime import timedelta
+import certifi
+import urllib3
+from django.utils import timezone
 from minio import Minio
+from minio.datatypes import PostPolicy
 from minio.error import S3Error
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _build_http_client():
+    """
+    Build the connection pool shared by every MinIO call in the process.
+
+    Keeping connections alive (and enough of them for concurrent upload
+    workers) saves a TCP/TLS handshake per request.
+    """
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=settings.MINIO_POOL_MAXSIZE,
+        block=False,
+        timeout=urllib3.Timeout(
+            connect=settings.MINIO_CONNECT_TIMEOUT, read=settings.MINIO_READ_TIMEOUT
+        ),
+        retries=urllib3.Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+    )
+
+
 class MinioService:
+    """
+    Access to the MinIO bucket that stores uploads.
+
+    The client, its connection pool and the bucket check are created on
+    first use rather than at import, so processes that never touch storage
+    (management commands, most workers) never pay for the round-trip.
+    """
+
     def __init__(self):
-        self.client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_USE_SSL
-        )
         self.bucket_name = settings.MINIO_BUCKET_NAME
-        self._ensure_bucket_exists()
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Get the MinIO client, creating it and checking the bucket once per process."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    client = Minio(
+                        settings.MINIO_ENDPOINT,
+                        access_key=settings.MINIO_ACCESS_KEY,
+                        secret_key=settings.MINIO_SECRET_KEY,
+                        secure=settings.MINIO_USE_SSL,
+                        http_client=_build_http_client(),
+                    )
+                    self._ensure_bucket_exists(client)
+                    self._client = client
+        return self._client
 
-    def _ensure_bucket_exists(self):
+    def _ensure_bucket_exists(self, client):
         """Create bucket if it doesn't exist."""
         try:
-            if not self.client.bucket_exists(self.bucket_name):
-                self.client.make_bucket(self.bucket_name)
+            if not client.bucket_exists(self.bucket_name):
+                client.make_bucket(self.bucket_name)
                 logger.info(f"Created bucket: {self.bucket_name}")
         except S3Error as e:
             logger.error(f"Error creating bucket: {e}")
@@ -70,6 +121,173 @@ class MinioService:
             logger.error(f"Unexpected error uploading file: {e}")
             raise ValidationError(f"Unexpected error: {str(e)}")
 
+    def upload_path(self, path, filename, folder="uploads", content_type="application/octet-stream"):
+        """
+        Upload a file from local disk to MinIO.
+
+        The file is streamed from disk, switching to a multipart upload for
+        large files, so it is never held in memory.
+
+        Args:
+            path: Path of the file on local disk
+            filename: Name to store the file under
+            folder: Folder path in MinIO bucket
+            content_type: MIME type of the file
+
+        Returns:
+            str: The filename of the uploaded file
+        """
+        try:
+            object_name = f"{folder}/{filename}"
+            self.client.fput_object(
+                self.bucket_name,
+                object_name,
+                path,
+                content_type=content_type,
+                part_size=settings.MINIO_PART_SIZE,
+            )
+
+            logger.info(f"File uploaded successfully: {object_name}")
+            return filename
+
+        except S3Error as e:
+            logger.error(f"Error uploading file: {e}")
+            raise ValidationError(f"Failed to upload file: {str(e)}")
+
+    def upload_bytes(self, data, filename, folder="uploads", content_type="application/octet-stream"):
+        """
+        Upload in-memory content to MinIO.
+
+        Args:
+            data: Bytes to store
+            filename: Name to store the file under
+            folder: Folder path in MinIO bucket
+            content_type: MIME type of the file
+
+        Returns:
+            str: The filename of the uploaded file
+        """
+        try:
+            object_name = f"{folder}/{filename}"
+            self.client.put_object(
+                self.bucket_name,
+                object_name,
+                io.BytesIO(data),
+                len(data),
+                content_type=content_type,
+            )
+            logger.info(f"File uploaded successfully: {object_name}")
+            return filename
+        except S3Error as e:
+            logger.error(f"Error uploading file: {e}")
+            raise ValidationError(f"Failed to upload file: {str(e)}")
+
+    def download_file(self, filename, folder="uploads"):
+        """
+        Read a file from MinIO.
+
+        Args:
+            filename: Name of the file
+            folder: Folder path in MinIO bucket
+
+        Returns:
+            bytes: The file content
+        """
+        response = None
+        try:
+            response = self.client.get_object(self.bucket_name, f"{folder}/{filename}")
+            return response.read()
+        except S3Error as e:
+            logger.error(f"Error downloading file: {e}")
+            raise ValidationError(f"Failed to download file: {str(e)}")
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
+    def read_file_head(self, filename, folder="uploads", length=16 * 1024):
+        """
+        Read the first bytes of a file in MinIO with a ranged GET.
+
+        Args:
+            filename: Name of the file
+            folder: Folder path in MinIO bucket
+            length: Number of bytes to read
+
+        Returns:
+            bytes: The start of the file
+        """
+        response = None
+        try:
+            response = self.client.get_object(
+                self.bucket_name, f"{folder}/{filename}", offset=0, length=length
+            )
+            return response.read()
+        except S3Error as e:
+            logger.error(f"Error reading file: {e}")
+            raise ValidationError(f"Failed to read file: {str(e)}")
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
+    def stat_file(self, filename, folder="uploads"):
+        """
+        Get the size and content type of a file in MinIO.
+
+        Args:
+            filename: Name of the file
+            folder: Folder path in MinIO bucket
+
+        Returns:
+            minio.datatypes.Object: Object metadata, or None if it does not exist
+        """
+        try:
+            return self.client.stat_object(self.bucket_name, f"{folder}/{filename}")
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            logger.error(f"Error reading file metadata: {e}")
+            raise ValidationError(f"Failed to read file metadata: {str(e)}")
+
+    def get_upload_policy(self, filename, folder, content_type, max_size, expires=600):
+        """
+        Get a presigned POST policy letting a client upload one file directly.
+
+        The policy pins the object name and content type and caps the size,
+        so the upload never passes through the application.
+
+        Args:
+            filename: Name the file will be stored under
+            folder: Folder path in MinIO bucket
+            content_type: The only content type accepted
+            max_size: Maximum file size in bytes
+            expires: Policy expiration time in seconds
+
+        Returns:
+            dict: The URL to POST to and the form fields to send with the file
+        """
+        try:
+            policy = PostPolicy(
+                self.bucket_name, timezone.now() + timedelta(seconds=expires)
+            )
+            policy.add_equals_condition("key", f"{folder}/{filename}")
+            policy.add_equals_condition("Content-Type", content_type)
+            policy.add_content_length_range_condition(1, max_size)
+
+            fields = self.client.presigned_post_policy(policy)
+            fields["key"] = f"{folder}/{filename}"
+            fields["Content-Type"] = content_type
+
+            scheme = "https" if settings.MINIO_USE_SSL else "http"
+            return {
+                "url": f"{scheme}://{settings.MINIO_ENDPOINT}/{self.bucket_name}",
+                "fields": fields,
+            }
+        except S3Error as e:
+            logger.error(f"Error generating upload policy: {e}")
+            raise ValidationError(f"Failed to generate upload policy: {str(e)}")
+
     def delete_file(self, filename, folder="uploads"):
         """
         Delete a file from MinIO.
@@ -114,6 +332,59 @@ class MinioService:
             logger.error(f"Error generating file URL: {e}")
             raise ValidationError(f"Failed to generate file URL: {str(e)}")
 
+    def get_cached_file_urls(self, filenames, folder="uploads"):
+        """
+        Get presigned URLs for several files, reusing URLs signed earlier.
+
+        URLs are signed for settings.POSTER_URL_EXPIRES seconds and cached
+        until less than CACHE_TTL of that remains, so a URL embedded in a
+        cached API response is still valid for as long as the response is.
+        All lookups go to the cache in one round-trip.
+
+        Args:
+            filenames: Names of the files
+            folder: Folder path in MinIO bucket
+
+        Returns:
+            dict: Presigned URL per filename
+        """
+        keys = {self._url_cache_key(filename, folder): filename for filename in set(filenames)}
+        cached = cache.get_many(keys)
+        urls = {keys[key]: url for key, url in cached.items()}
+
+        missing = {key: filename for key, filename in keys.items() if key not in cached}
+        if missing:
+            signed = {
+                key: self.get_file_url(filename, folder=folder, expires=settings.POSTER_URL_EXPIRES)
+                for key, filename in missing.items()
+            }
+            cache.set_many(
+                signed, max(settings.POSTER_URL_EXPIRES - settings.CACHE_TTL - 60, 60)
+            )
+            urls.update({missing[key]: url for key, url in signed.items()})
+
+        return urls
+
+    def get_cached_file_url(self, filename, folder="uploads"):
+        """Get a presigned URL for a file, reusing a URL signed earlier."""
+        return self.get_cached_file_urls([filename], folder=folder)[filename]
+
+    async def aget_cached_file_url(self, filename, folder="uploads"):
+        """
+        Async variant of ``get_cached_file_url``: a cached URL is read
+        without blocking the event loop, signing falls back to a thread.
+        """
+        from asgiref.sync import sync_to_async
+        from DicoEvent.cache import aget
+
+        url = await aget(self._url_cache_key(filename, folder))
+        if url is None:
+            url = await sync_to_async(self.get_cached_file_url)(filename, folder=folder)
+        return url
+
+    def _url_cache_key(self, filename, folder):
+        return f"presigned_url_{folder}_{filename}"
+
 
 # Global instance
 minio_service = MinioService()
\ No newline at end of file
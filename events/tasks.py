@@ -1,20 +1,23 @@
+import os
+import time
+from itertools import islice
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
 from loguru import logger
-from .models import Event
+from .models import Event, ReminderDelivery
 from registrations.models import Registration
 
-@shared_task
-def send_event_reminder_email(user_email, user_name, event_name, event_start_time, event_location):
-    """
-    Send event reminder email to a specific user
-    """
-    try:
-        subject = f'Event Reminder: {event_name}'
-        message = f"""
+
+def _reminder_subject(event_name):
+    return f'Event Reminder: {event_name}'
+
+
+def _reminder_message(user_name, event_name, event_start_time, event_location):
+    return f"""
         Hi {user_name},
         
         This is a reminder that you have registered for the following event:
@@ -28,6 +31,27 @@ def send_event_reminder_email(user_email, user_name, event_name, event_start_tim
         Best regards,
         DicoEvent Team
         """
+
+
+def _display_name(first_name, last_name, username):
+    return f"{first_name or ''} {last_name or ''}".strip() or username
+
+
+def _chunked(iterable, size):
+    """Yield lists of at most ``size`` items from an iterable."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@shared_task
+def send_event_reminder_email(user_email, user_name, event_name, event_start_time, event_location):
+    """
+    Send event reminder email to a specific user
+    """
+    try:
+        subject = _reminder_subject(event_name)
+        message = _reminder_message(user_name, event_name, event_start_time, event_location)
         
         send_mail(
             subject=subject,
@@ -44,10 +68,187 @@ def send_event_reminder_email(user_email, user_name, event_name, event_start_tim
         logger.error(f"Failed to send reminder email to {user_email}: {str(e)}")
         raise e
 
+@shared_task
+def send_event_reminder_batch(recipients, event_name, event_start_time, event_location):
+    """
+    Send event reminder emails to a chunk of attendees over a single SMTP connection
+    
+    Every recipient is a reminder claimed in the ledger. Delivered reminders
+    are marked as sent; failed ones keep their claim, and dispatch_due_reminders
+    queues them again once the claim outlives REMINDER_CLAIM_LEASE.
+    
+    Args:
+        recipients: List of [delivery id, email, display name] triples
+    """
+    started = time.monotonic()
+    subject = _reminder_subject(event_name)
+    sent_ids = []
+    
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for delivery_id, user_email, user_name in recipients:
+            message = EmailMessage(
+                subject=subject,
+                body=_reminder_message(user_name, event_name, event_start_time, event_location),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[user_email],
+                connection=connection,
+            )
+            try:
+                message.send()
+                sent_ids.append(delivery_id)
+            except Exception as e:
+                logger.error(f"Failed to send reminder email to {user_email}: {str(e)}")
+    except Exception as e:
+        logger.error(f"Failed to send reminder batch for event {event_name}: {str(e)}")
+        raise e
+    finally:
+        connection.close()
+        ReminderDelivery.objects.filter(id__in=sent_ids).update(sent_at=timezone.now())
+    
+    elapsed = time.monotonic() - started
+    rate = len(sent_ids) / elapsed if elapsed else float(len(sent_ids))
+    logger.info(
+        f"Sent {len(sent_ids)}/{len(recipients)} reminder emails for event {event_name} "
+        f"in {elapsed:.2f}s ({rate:.1f} emails/sec)"
+    )
+    return f"Sent {len(sent_ids)} reminder emails"
+
+def _queue_event_reminders(event, batch_size, registration_ids=None):
+    """
+    Claim the pending reminders of an event and queue them in batches.
+    
+    Args:
+        event: Event to remind attendees of
+        batch_size: Recipients per email task
+        registration_ids: Only remind these registrations (default: all)
+    
+    Returns:
+        tuple: (number of reminders queued, number of batches)
+    """
+    registrations = (
+        Registration.objects.filter(
+            ticket__event=event, status=Registration.CONFIRMED
+        )
+        .exclude(user__email__isnull=True)
+        .exclude(user__email="")
+    )
+    if registration_ids is not None:
+        registrations = registrations.filter(id__in=registration_ids)
+    
+    # Claim the reminders no earlier or concurrent run has taken, so
+    # overlapping runs never email the same attendee twice
+    claimed = ReminderDelivery.objects.claim(
+        registrations, ReminderDelivery.EVENT_STARTING
+    )
+    
+    # Stream only the recipient columns instead of whole model rows
+    recipients = claimed.values_list(
+        "id",
+        "registration__user__email",
+        "registration__user__first_name",
+        "registration__user__last_name",
+        "registration__user__username",
+    ).iterator(chunk_size=batch_size)
+    
+    reminder_count = 0
+    batch_count = 0
+    
+    # One task (and one SMTP connection) per chunk of attendees
+    for chunk in _chunked(recipients, batch_size):
+        send_event_reminder_batch.delay(
+            recipients=[
+                [str(delivery_id), email, _display_name(first_name, last_name, username)]
+                for delivery_id, email, first_name, last_name, username in chunk
+            ],
+            event_name=event.name,
+            event_start_time=event.start_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            event_location=event.location
+        )
+        
+        reminder_count += len(chunk)
+        batch_count += 1
+    
+    return reminder_count, batch_count
+
+@shared_task
+def send_reminders_for_event(event_id):
+    """
+    Send the reminder emails of one event
+    """
+    try:
+        event = Event.objects.filter(id=event_id).first()
+        if event is None or event.status != 'scheduled' or event.start_time <= timezone.now():
+            logger.info(f"Skipping reminders for event {event_id} - not an upcoming scheduled event")
+            return "No reminders needed"
+        
+        reminder_count, batch_count = _queue_event_reminders(event, settings.REMINDER_BATCH_SIZE)
+        
+        logger.info(f"Scheduled {reminder_count} reminder emails in {batch_count} batches for event {event.name}")
+        return f"Scheduled {reminder_count} reminder emails"
+        
+    except Exception as e:
+        logger.error(f"Error sending reminders for event {event_id}: {str(e)}")
+        raise e
+
+@shared_task
+def dispatch_due_reminders():
+    """
+    Queue the reminders of every event whose reminder time has come
+    """
+    from .schedule import reminder_schedule
+    
+    try:
+        # Events taken off the schedule whose claimed reminders were never
+        # sent (worker died, batch lost) are dispatched again once the
+        # claims outlive their lease
+        abandoned_ids = [
+            str(event_id)
+            for event_id in ReminderDelivery.objects.abandoned(ReminderDelivery.EVENT_STARTING)
+            .filter(
+                registration__ticket__event__status='scheduled',
+                registration__ticket__event__start_time__gt=timezone.now(),
+            )
+            .values_list('registration__ticket__event_id', flat=True)
+            .distinct()
+        ]
+        
+        due = reminder_schedule.pop_due()
+        event_ids = [event_id for event_id, _ in due]
+        event_ids += [event_id for event_id in abandoned_ids if event_id not in event_ids]
+
+        dispatched = 0
+        undispatched = []
+        for event_id in event_ids:
+            try:
+                send_reminders_for_event.delay(event_id)
+                dispatched += 1
+            except Exception as e:
+                logger.error(f"Failed to dispatch reminders for event {event_id}: {str(e)}")
+                undispatched.append(event_id)
+        
+        # Scheduled reminders that did not reach the broker are put back for
+        # the next run; abandoned claims are found again anyway
+        reminder_schedule.restore(
+            [(event_id, due_at) for event_id, due_at in due if event_id in undispatched]
+        )
+        
+        if event_ids:
+            logger.info(f"Dispatched reminders for {dispatched}/{len(event_ids)} events")
+        return f"Dispatched reminders for {dispatched} events"
+        
+    except Exception as e:
+        logger.error(f"Error in dispatch_due_reminders task: {str(e)}")
+        raise e
+
 @shared_task
 def send_event_reminders():
     """
     Check for events starting in 2 hours and send reminder emails to registered users
+    
+    Reminders are normally dispatched from the precomputed schedule; this
+    scan is kept for the manual trigger and as a catch-up after an outage.
     """
     try:
         # Calculate the time range for events starting in approximately 2 hours
@@ -65,28 +266,14 @@ def send_event_reminders():
         )
         
         reminder_count = 0
+        batch_count = 0
         
         for event in upcoming_events:
-            # Get all registrations for this event
-            registrations = Registration.objects.filter(
-                ticket__event=event
-            ).select_related('user', 'ticket')
-            
-            for registration in registrations:
-                user = registration.user
-                
-                # Send reminder email
-                send_event_reminder_email.delay(
-                    user_email=user.email,
-                    user_name=f"{user.first_name} {user.last_name}".strip() or user.username,
-                    event_name=event.name,
-                    event_start_time=event.start_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
-                    event_location=event.location
-                )
-                
-                reminder_count += 1
-        
-        logger.info(f"Scheduled {reminder_count} reminder emails for {len(upcoming_events)} events")
+            queued, batches = _queue_event_reminders(event, settings.REMINDER_BATCH_SIZE)
+            reminder_count += queued
+            batch_count += batches
+        
+        logger.info(f"Scheduled {reminder_count} reminder emails in {batch_count} batches for {len(upcoming_events)} events")
         return f"Scheduled {reminder_count} reminder emails"
         
     except Exception as e:
@@ -108,10 +295,24 @@ def send_reminder_for_new_registration(registration_id):
         time_until_event = event.start_time - now
         
         # If event starts within 2 hours and 15 minutes, send reminder
-        if timedelta(hours=1, minutes=45) <= time_until_event <= timedelta(hours=2, minutes=15) and event.status == 'scheduled':
-            send_event_reminder_email.delay(
-                user_email=user.email,
-                user_name=f"{user.first_name} {user.last_name}".strip() or user.username,
+        if timedelta(hours=1, minutes=45) <= time_until_event <= timedelta(hours=2, minutes=15) and event.status == 'scheduled' and user.email:
+            # Goes through the same ledger as the periodic run, so a
+            # registration caught by both is only reminded once
+            claimed = ReminderDelivery.objects.claim(
+                Registration.objects.filter(id=registration_id),
+                ReminderDelivery.EVENT_STARTING,
+            )
+            delivery = claimed.first()
+            if delivery is None:
+                logger.info(f"Reminder for registration {registration_id} already claimed")
+                return "Reminder already sent"
+            
+            send_event_reminder_batch.delay(
+                recipients=[[
+                    str(delivery.id),
+                    user.email,
+                    _display_name(user.first_name, user.last_name, user.username),
+                ]],
                 event_name=event.name,
                 event_start_time=event.start_time.strftime('%Y-%m-%d %H:%M:%S UTC'),
                 event_location=event.location
@@ -128,4 +329,152 @@ def send_reminder_for_new_registration(registration_id):
         return "Registration not found"
     except Exception as e:
         logger.error(f"Error sending reminder for new registration {registration_id}: {str(e)}")
-        raise e
\ No newline at end of file
+        raise e
+
+@shared_task
+def send_reminders_for_new_registrations(registration_ids):
+    """
+    Send immediate reminders for a batch of new registrations, like
+    send_reminder_for_new_registration does for one, with one query per
+    event instead of one task per registration
+    """
+    try:
+        now = timezone.now()
+        events = Event.objects.filter(
+            status='scheduled',
+            start_time__range=(
+                now + timedelta(hours=1, minutes=45),
+                now + timedelta(hours=2, minutes=15),
+            ),
+            tickets__registrations__id__in=registration_ids,
+        ).distinct()
+        
+        reminder_count = 0
+        for event in events:
+            count, batch_count = _queue_event_reminders(
+                event, settings.REMINDER_BATCH_SIZE, registration_ids
+            )
+            reminder_count += count
+            logger.info(f"Scheduled {count} immediate reminders in {batch_count} batches for event {event.name}")
+        
+        return f"Scheduled {reminder_count} immediate reminders for {len(registration_ids)} registrations"
+        
+    except Exception as e:
+        logger.error(f"Error sending reminders for {len(registration_ids)} new registrations: {str(e)}")
+        raise e
+
+@shared_task(bind=True, max_retries=settings.POSTER_UPLOAD_MAX_RETRIES)
+def upload_event_poster(self, event_id, spool_path, filename, content_type):
+    """
+    Move a spooled poster to MinIO and make it the event's poster
+    
+    Failed uploads are retried with exponential backoff; once the retries
+    are exhausted the poster is marked as failed.
+    """
+    from .services import minio_service
+    from .cache import events_list_cache
+    
+    try:
+        started = time.monotonic()
+        minio_service.upload_path(
+            spool_path, filename, folder="event-posters", content_type=content_type
+        )
+        
+        previous = Event.objects.filter(id=event_id).values('poster', 'poster_variants').first()
+        Event.objects.filter(id=event_id).update(
+            poster=filename, poster_status='ready', poster_variants={}
+        )
+        cache.delete(f"event_detail_{event_id}")
+        events_list_cache.invalidate()
+        
+        os.remove(spool_path)
+        generate_poster_variants.delay(event_id, filename)
+        if previous and previous['poster'] and previous['poster'] != filename:
+            delete_poster_files.delay(previous['poster'], previous['poster_variants'])
+        logger.info(f"Poster {filename} for event {event_id} uploaded in {time.monotonic() - started:.2f}s")
+        return f"Poster {filename} uploaded"
+        
+    except FileNotFoundError:
+        logger.error(f"Spooled poster {spool_path} for event {event_id} is missing")
+        Event.objects.filter(id=event_id).update(poster_status='failed')
+        return "Spooled poster missing"
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            logger.error(f"Giving up uploading poster for event {event_id}: {str(e)}")
+            Event.objects.filter(id=event_id).update(poster_status='failed')
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+            raise e
+        
+        logger.warning(f"Retrying poster upload for event {event_id}: {str(e)}")
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
+
+@shared_task(bind=True, max_retries=3)
+def generate_poster_variants(self, event_id, filename):
+    """
+    Render the resized WebP (and AVIF, when supported) copies of a poster
+    and store them next to the original
+    """
+    from .images import CONTENT_TYPES, render_variants
+    from .services import minio_service
+    from .cache import events_list_cache
+    
+    try:
+        started = time.monotonic()
+        original = minio_service.download_file(filename, folder="event-posters")
+        
+        variants = {}
+        variant_bytes = 0
+        for size, fmt, variant_name, data in render_variants(original, filename):
+            minio_service.upload_bytes(
+                data, variant_name, folder="event-posters", content_type=CONTENT_TYPES[fmt]
+            )
+            variants.setdefault(size, {})[fmt] = variant_name
+            variant_bytes += len(data)
+        
+        # Skip if the poster was replaced in the meantime
+        if Event.objects.filter(id=event_id, poster=filename).update(poster_variants=variants):
+            # List pages carry the thumbnail URL too
+            cache.delete(f"event_detail_{event_id}")
+            events_list_cache.invalidate()
+        
+        logger.info(
+            f"Rendered {sum(len(formats) for formats in variants.values())} variants of poster "
+            f"{filename} ({len(original)} -> {variant_bytes} bytes) in {time.monotonic() - started:.2f}s"
+        )
+        return variants
+        
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            logger.error(f"Giving up rendering variants of poster {filename}: {str(e)}")
+            raise e
+        
+        logger.warning(f"Retrying variants of poster {filename}: {str(e)}")
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
+
+@shared_task(bind=True, max_retries=3)
+def delete_poster_files(self, filename, variants):
+    """
+    Delete a replaced poster and its variants from MinIO, unless an event
+    still uses the poster
+    """
+    from .services import minio_service
+    
+    if Event.objects.filter(poster=filename).exists():
+        logger.info(f"Poster {filename} is still in use, keeping it")
+        return "Poster still in use"
+    
+    filenames = [filename] + [
+        variant_name for formats in variants.values() for variant_name in formats.values()
+    ]
+    try:
+        for name in filenames:
+            minio_service.delete_file(name, folder="event-posters")
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            logger.error(f"Giving up deleting poster {filename}: {str(e)}")
+            raise e
+        raise self.retry(exc=e, countdown=2 ** self.request.retries)
+    
+    logger.info(f"Deleted replaced poster {filename} and {len(filenames) - 1} variants")
+    return f"Deleted {len(filenames)} poster files"
@@ -1,3 +1,220 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from DicoEvent.testing import (
+    QueryBudgetMixin,
+    create_event,
+    create_events,
+    create_registrations,
+    create_ticket,
+    create_users,
+)
+from .models import ReminderDelivery
+from .tasks import (
+    dispatch_due_reminders,
+    send_event_reminder_batch,
+    send_event_reminders,
+    send_reminder_for_new_registration,
+    send_reminders_for_event,
+)
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ReminderFixtureMixin:
+    attendee_count = 7
+
+    def create_event_with_attendees(self):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        event = create_event(
+            organizer, start_time=timezone.now() + timedelta(hours=1, minutes=55)
+        )
+        attendees = create_users(self.attendee_count, "attendee", with_email=True)
+        registrations = create_registrations(create_ticket(event, price=0), attendees)
+        return event, attendees, registrations
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    REMINDER_BATCH_SIZE=3,
+    REMINDER_CLAIM_LEASE=600,
+)
+class ReminderExactlyOnceTests(ReminderFixtureMixin, TestCase):
+    """Overlapping reminder runs email every attendee exactly once."""
+
+    def setUp(self):
+        self.event, self.attendees, self.registrations = (
+            self.create_event_with_attendees()
+        )
+        self.emails = sorted(user.email for user in self.attendees)
+
+    def run_overlapping(self, *runs):
+        """
+        Start every run before any email batch they queued is delivered,
+        as runs overlapping on a busy broker would, then deliver the batches.
+        """
+        with mock.patch("events.tasks.send_event_reminder_batch.delay") as delay:
+            for run in runs:
+                run()
+        for call in delay.call_args_list:
+            send_event_reminder_batch(**call.kwargs)
+
+    def recipients(self):
+        return sorted(message.to[0] for message in mail.outbox)
+
+    def test_overlapping_runs_send_each_reminder_once(self):
+        self.run_overlapping(
+            lambda: send_reminders_for_event(self.event.id),
+            send_event_reminders,
+            lambda: send_reminders_for_event(self.event.id),
+            lambda: send_reminder_for_new_registration(self.registrations[0].id),
+        )
+        self.assertEqual(self.recipients(), self.emails)
+
+        # Runs after the delivery find nothing left to send
+        self.run_overlapping(
+            send_event_reminders, lambda: send_reminders_for_event(self.event.id)
+        )
+        self.assertEqual(self.recipients(), self.emails)
+        self.assertFalse(ReminderDelivery.objects.filter(sent_at__isnull=True).exists())
+
+    def test_failed_deliveries_are_retried_once(self):
+        failing = self.attendees[0].email
+        original_send = mail.EmailMessage.send
+
+        def send(message, *args, **kwargs):
+            if message.to == [failing]:
+                raise ConnectionError("Mailbox unavailable")
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch("django.core.mail.EmailMessage.send", send):
+            self.run_overlapping(lambda: send_reminders_for_event(self.event.id))
+        self.assertEqual(self.recipients(), [e for e in self.emails if e != failing])
+
+        # The failed reminder keeps its claim until the lease runs out
+        self.run_overlapping(lambda: send_reminders_for_event(self.event.id))
+        self.assertEqual(len(mail.outbox), len(self.emails) - 1)
+
+        ReminderDelivery.objects.filter(sent_at__isnull=True).update(
+            claimed_at=timezone.now() - timedelta(seconds=601)
+        )
+        with mock.patch(
+            "events.schedule.reminder_schedule.pop_due", return_value=[]
+        ), mock.patch("events.tasks.send_reminders_for_event.delay") as dispatch:
+            dispatch_due_reminders()
+        self.assertEqual(
+            [call.args for call in dispatch.call_args_list], [(str(self.event.id),)]
+        )
+
+        self.run_overlapping(
+            lambda: send_reminders_for_event(str(self.event.id)), send_event_reminders
+        )
+        self.assertEqual(self.recipients(), self.emails)
+
+    def test_abandoned_claims_are_reclaimed_after_the_lease(self):
+        # The batches of this run are lost before they are delivered
+        with mock.patch("events.tasks.send_event_reminder_batch.delay"):
+            send_reminders_for_event(self.event.id)
+
+        # Within the lease the claims still belong to the lost run
+        self.run_overlapping(lambda: send_reminders_for_event(self.event.id))
+        self.assertEqual(mail.outbox, [])
+
+        ReminderDelivery.objects.update(
+            claimed_at=timezone.now() - timedelta(seconds=601)
+        )
+        with mock.patch(
+            "events.schedule.reminder_schedule.pop_due", return_value=[]
+        ), mock.patch("events.tasks.send_reminders_for_event.delay") as dispatch:
+            dispatch_due_reminders()
+        self.assertEqual(
+            [call.args for call in dispatch.call_args_list], [(str(self.event.id),)]
+        )
+
+        self.run_overlapping(
+            lambda: send_reminders_for_event(self.event.id),
+            lambda: send_reminders_for_event(self.event.id),
+        )
+        self.assertEqual(self.recipients(), self.emails)
+
+    def test_undispatched_reminders_go_back_on_the_schedule(self):
+        due = [(str(self.event.id), 1700000000.0)]
+        with mock.patch(
+            "events.schedule.reminder_schedule.pop_due", return_value=due
+        ), mock.patch(
+            "events.schedule.reminder_schedule.restore"
+        ) as restore, mock.patch(
+            "events.tasks.send_reminders_for_event.delay",
+            side_effect=ConnectionError("Broker unavailable"),
+        ):
+            dispatch_due_reminders()
+        restore.assert_called_once_with(due)
+
+
+@skipUnless(connection.vendor == "postgresql", "Concurrent claims need row locks")
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    REMINDER_BATCH_SIZE=3,
+)
+class ConcurrentReminderRunTests(ReminderFixtureMixin, TransactionTestCase):
+    """Reminder runs started at the same moment on separate connections."""
+
+    attendee_count = 50
+
+    def test_concurrent_runs_claim_each_reminder_once(self):
+        event, attendees, _ = self.create_event_with_attendees()
+        runs = 4
+        barrier = threading.Barrier(runs)
+
+        def run():
+            try:
+                barrier.wait()
+                send_reminders_for_event(event.id)
+            finally:
+                connections.close_all()
+
+        with mock.patch("events.tasks.send_event_reminder_batch.delay") as delay:
+            threads = [threading.Thread(target=run) for _ in range(runs)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        claimed = [
+            recipient[0]
+            for call in delay.call_args_list
+            for recipient in call.kwargs["recipients"]
+        ]
+        self.assertEqual(len(claimed), len(attendees))
+        self.assertEqual(len(set(claimed)), len(attendees))
+
+
+class EventListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """The event list runs a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_events(create_users(60, "organizer"))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_query_budget(self):
+        # COUNT and the page
+        with self.assertMaxQueries(2):
+            response = self.client.get("/api/events/")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["events"]), 10)
+
+    def test_cursor_query_budget(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get("/api/events/?cursor=")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["events"]), 10)
@@ -1,10 +1,20 @@
 from django.urls import path
-from .views import EventsView, EventDetailView, EventPosterUploadView, EventPosterView, SendEventRemindersView
+from .views import (
+    EventsView,
+    EventDetailView,
+    EventPosterUploadView,
+    EventPosterPresignView,
+    EventPosterConfirmView,
+    EventPosterView,
+    SendEventRemindersView,
+)
 
 urlpatterns = [
     path("", EventsView.as_view(), name="events"),
     path("<uuid:event_id>/", EventDetailView.as_view(), name="event_detail"),
     path("upload/", EventPosterUploadView.as_view(), name="event_poster_upload"),
+    path("upload/presign/", EventPosterPresignView.as_view(), name="event_poster_presign"),
+    path("upload/confirm/", EventPosterConfirmView.as_view(), name="event_poster_confirm"),
     path("<uuid:event_id>/poster/", EventPosterView.as_view(), name="event_poster"),
     path("send-reminders/", SendEventRemindersView.as_view(), name="send_event_reminders"),
 ]
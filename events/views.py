@@ -1,4 +1,4 @@
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
@@ -6,17 +6,23 @@ from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.core.cache import cache
 from django.conf import settings
 from loguru import logger
+from DicoEvent.pagination import InvalidCursor, keyset_page_data
+from registrations.services import seat_availability
 from users.permissions import (
     IsAdminOrSuperUser,
     IsOrganizerAdminOrSuperUser,
     IsOrganizerOwnerOrAdmin,
 )
+from .cache import events_list_cache
+from .images import POSTER_SIZES, pick_poster_variant
 from .models import Event
 from .serializers import (
     EventCreateSerializer,
     EventListSerializer,
     EventUpdateSerializer,
     EventPosterUploadSerializer,
+    EventPosterPresignSerializer,
+    EventPosterConfirmSerializer,
 )
 from .tasks import send_event_reminders
 
@@ -30,24 +36,30 @@ class EventsView(APIView):
     def get(self, request):
         logger.info(f"GET /events - User: {getattr(request.user, 'username', 'anonymous')} - Page: {request.GET.get('page', 1)}")
         
+        # Opt-in keyset mode: ?cursor= (empty for the first page)
+        if "cursor" in request.GET:
+            return self._get_keyset_page(request)
+
         # Get page number from query params
         page_number = request.GET.get("page", 1)
         page_size = 10  # Events per page
         
         try:
             # Try to get from cache first
-            cache_key = f"events_list_page_{page_number}"
-            cached_data = cache.get(cache_key)
+            cache_key = f"page_{page_number}"
+            cached_data = events_list_cache.get(cache_key)
             
             if cached_data:
                 logger.info(f"Events list page {page_number} served from cache")
+                # Seats change far more often than the cached page is rebuilt
+                seat_availability.overlay("event", cached_data["events"])
                 # Return cached data with X-Data-Source header
                 response = Response(cached_data, status=status.HTTP_200_OK)
                 response['X-Data-Source'] = 'cache'
                 return response
             
             # If not in cache, get from database
-            events = Event.objects.all().order_by("-created_at")
+            events = Event.objects.select_related("organizer").order_by("-created_at")
 
             # Create paginator
             paginator = Paginator(events, page_size)
@@ -85,7 +97,7 @@ class EventsView(APIView):
             }
             
             # Cache the data for 1 hour
-            cache.set(cache_key, data, settings.CACHE_TTL)
+            events_list_cache.set(cache_key, data)
             logger.info(f"Events list page {page_number} cached successfully - Total events: {paginator.count}")
             
             # Return fresh data with X-Data-Source header
@@ -100,6 +112,45 @@ class EventsView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _get_keyset_page(self, request):
+        """Serve one page in keyset mode, without COUNT(*) or OFFSET."""
+        cursor = request.GET.get("cursor")
+        page_size = 10  # Events per page
+
+        cache_key = f"cursor_{cursor}"
+        cached_data = events_list_cache.get(cache_key)
+        if cached_data:
+            seat_availability.overlay("event", cached_data["events"])
+            response = Response(cached_data, status=status.HTTP_200_OK)
+            response['X-Data-Source'] = 'cache'
+            return response
+
+        try:
+            data = keyset_page_data(
+                Event.objects.select_related("organizer"),
+                cursor,
+                EventListSerializer,
+                "events",
+                page_size=page_size,
+            )
+        except InvalidCursor:
+            logger.warning(f"Invalid events cursor '{cursor}'")
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving events list: {str(e)}")
+            return Response(
+                {"error": "Failed to retrieve events"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        events_list_cache.set(cache_key, data)
+
+        response = Response(data, status=status.HTTP_200_OK)
+        response['X-Data-Source'] = 'database'
+        return response
+
     def post(self, request):
         logger.info(f"POST /events - User: {getattr(request.user, 'username', 'anonymous')} - Creating new event")
         
@@ -109,7 +160,7 @@ class EventsView(APIView):
                 event = serializer.save()
                 
                 # Invalidate cache for events list (all pages)
-                self._invalidate_events_cache()
+                events_list_cache.invalidate()
                 
                 logger.info(f"Event {event.id} created successfully by {getattr(request.user, 'username', 'anonymous')}")
                 return Response(
@@ -125,12 +176,6 @@ class EventsView(APIView):
                 {"error": "Failed to create event"}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        
-    def _invalidate_events_cache(self):
-        """Invalidate all events list cache pages."""
-        # Clear all events list cache pages
-        for page in range(1, 100):  # Assume max 100 pages
-            cache.delete(f"events_list_page_{page}")
 
 
 class EventDetailView(APIView):
@@ -138,7 +183,7 @@ class EventDetailView(APIView):
 
     def get_object(self, event_id):
         try:
-            return Event.objects.get(id=event_id)
+            return Event.objects.select_related("organizer").get(id=event_id)
         except Event.DoesNotExist:
             return None
 
@@ -148,6 +193,7 @@ class EventDetailView(APIView):
         cached_data = cache.get(cache_key)
         
         if cached_data:
+            seat_availability.overlay("event", [cached_data])
             # Return cached data with X-Data-Source header
             response = Response(cached_data, status=status.HTTP_200_OK)
             response['X-Data-Source'] = 'cache'
@@ -186,7 +232,7 @@ class EventDetailView(APIView):
             cache.delete(f"event_detail_{event_id}")
             
             # Invalidate cache for events list (all pages)
-            self._invalidate_events_cache()
+            events_list_cache.invalidate()
             
             response_serializer = EventListSerializer(updated_event)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -205,37 +251,25 @@ class EventDetailView(APIView):
         cache.delete(f"event_detail_{event_id}")
         
         # Invalidate cache for events list (all pages)
-        self._invalidate_events_cache()
+        events_list_cache.invalidate()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
-        
-    def _invalidate_events_cache(self):
-        """Invalidate all events list cache pages."""
-        # Clear all events list cache pages
-        for page in range(1, 100):  # Assume max 100 pages
-            cache.delete(f"events_list_page_{page}")
 
 
 class EventPosterUploadView(APIView):
     permission_classes = [IsOrganizerAdminOrSuperUser]
     
     def post(self, request):
-        """Upload event poster."""
+        """Accept an event poster; the upload to storage runs in the background."""
         serializer = EventPosterUploadSerializer(data=request.data)
         
         if serializer.is_valid():
             try:
                 result = serializer.save()
                 
-                # Invalidate cache for the specific event detail
-                event_id = result.get('id')
-                if event_id:
-                    cache.delete(f"event_detail_{event_id}")
-                
-                # Invalidate cache for events list (all pages)
-                self._invalidate_events_cache()
-                
-                return Response(result, status=status.HTTP_201_CREATED)
+                # Caches are invalidated by the upload task once the poster
+                # is live
+                return Response(result, status=status.HTTP_202_ACCEPTED)
             except Exception as e:
                 return Response(
                     {"error": f"Upload failed: {str(e)}"}, 
@@ -243,41 +277,112 @@ class EventPosterUploadView(APIView):
                 )
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class EventPosterPresignView(APIView):
+    permission_classes = [IsOrganizerAdminOrSuperUser]
+    
+    def post(self, request):
+        """Get a presigned policy to upload an event poster straight to storage."""
+        serializer = EventPosterPresignSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            try:
+                result = serializer.save()
+                return Response(result, status=status.HTTP_201_CREATED)
+            except serializers.ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            except Exception as e:
+                return Response(
+                    {"error": f"Failed to sign upload: {str(e)}"}, 
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class EventPosterConfirmView(APIView):
+    permission_classes = [IsOrganizerAdminOrSuperUser]
+    
+    def post(self, request):
+        """Attach a poster uploaded through a presigned policy to its event."""
+        serializer = EventPosterConfirmSerializer(data=request.data)
+        
+        try:
+            valid = serializer.is_valid()
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to check upload: {str(e)}"}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
         
-    def _invalidate_events_cache(self):
-        """Invalidate all events list cache pages."""
-        # Clear all events list cache pages
-        for page in range(1, 100):  # Assume max 100 pages
-            cache.delete(f"events_list_page_{page}")
+        if valid:
+            try:
+                result = serializer.save()
+            except serializers.ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Invalidate cache for the specific event detail
+            cache.delete(f"event_detail_{result['id']}")
+            
+            # Invalidate cache for events list (all pages)
+            events_list_cache.invalidate()
+            
+            return Response(result, status=status.HTTP_200_OK)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class EventPosterView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request, event_id):
-        """Get event poster URL."""
+        """
+        Get event poster URL, optionally of a resized variant
+        (?size=thumb|medium, ?image_format=webp|avif).
+        """
+        size = request.GET.get("size", "original")
+        if size != "original" and size not in POSTER_SIZES:
+            return Response(
+                {"detail": f"Invalid size. Allowed sizes: original, {', '.join(POSTER_SIZES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         try:
-            event = Event.objects.get(id=event_id)
+            event = Event.objects.only(
+                "id", "poster", "poster_status", "poster_variants"
+            ).get(id=event_id)
             
             if not event.poster:
+                if event.poster_status == "pending":
+                    return Response(
+                        {"detail": "Event poster is being processed."},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
                 return Response(
                     {"detail": "Event poster not found."}, 
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Generate presigned URL for the poster
+            filename, served_size, served_format = pick_poster_variant(
+                event, size, request.GET.get("image_format")
+            )
+            
+            # Reuse the presigned URL while it stays valid long enough
             try:
                 from .services import minio_service
-                poster_url = minio_service.get_file_url(
-                    event.poster, 
-                    folder="event-posters",
-                    expires=3600  # 1 hour
+                poster_url = minio_service.get_cached_file_url(
+                    filename, 
+                    folder="event-posters"
                 )
                 
                 return Response({
                     "event_id": str(event.id),
                     "poster_url": poster_url,
-                    "filename": event.poster
+                    "filename": filename,
+                    "size": served_size,
+                    "format": served_format,
+                    "poster_status": event.poster_status
                 }, status=status.HTTP_200_OK)
                 
             except Exception as e:
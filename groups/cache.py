@@ -0,0 +1,4 @@
+from DicoEvent.cache import CacheNamespace
+
+# Every cached page of the group list, invalidated as a whole on writes
+groups_list_cache = CacheNamespace("groups_list")
@@ -1,3 +1,28 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from DicoEvent.testing import QueryBudgetMixin
 
-# Create your tests here.
+User = get_user_model()
+
+
+class GroupListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """The group list runs a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Group.objects.bulk_create([Group(name=f"group{i}") for i in range(60)])
+        cls.admin = User.objects.create_superuser(username="admin", password="secret")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_query_budget(self):
+        # The page, plus the role lookup of the permission check
+        with self.assertMaxQueries(2):
+            response = self.client.get("/api/groups/")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["groups"]), settings.LIST_PAGE_SIZE)
@@ -4,7 +4,9 @@ from rest_framework.views import APIView
 from django.contrib.auth.models import Group
 from django.core.cache import cache
 from django.conf import settings
+from DicoEvent.pagination import InvalidCursor, keyset_page_data, stream_ndjson
 from users.permissions import IsAdminOrSuperUser
+from .cache import groups_list_cache
 from .serializers import (
     GroupCreateSerializer,
     GroupListSerializer,
@@ -17,9 +19,16 @@ class GroupsView(APIView):
     permission_classes = [IsAdminOrSuperUser]
 
     def get(self, request):
+        groups = Group.objects.all()
+
+        if request.GET.get("stream") == "ndjson":
+            return stream_ndjson(groups, GroupListSerializer)
+
+        cursor = request.GET.get("cursor")
+
         # Try to get from cache first
-        cache_key = "groups_list"
-        cached_data = cache.get(cache_key)
+        cache_key = f"cursor_{cursor or ''}"
+        cached_data = groups_list_cache.get(cache_key)
         
         if cached_data:
             # Return cached data with X-Data-Source header
@@ -27,13 +36,18 @@ class GroupsView(APIView):
             response['X-Data-Source'] = 'cache'
             return response
         
-        # If not in cache, get from database
-        groups = Group.objects.all().order_by("name")
-        serializer = GroupListSerializer(groups, many=True)
-        data = {"groups": serializer.data}
+        # If not in cache, get one page from database
+        try:
+            data = keyset_page_data(
+                groups, cursor, GroupListSerializer, "groups", ordering=("name", "id")
+            )
+        except InvalidCursor:
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Cache the data for 1 hour
-        cache.set(cache_key, data, settings.CACHE_TTL)
+        groups_list_cache.set(cache_key, data)
         
         # Return fresh data with X-Data-Source header
         response = Response(data, status=status.HTTP_200_OK)
@@ -46,7 +60,7 @@ class GroupsView(APIView):
             group = serializer.save()
             
             # Invalidate groups list cache
-            cache.delete("groups_list")
+            groups_list_cache.invalidate()
             
             return Response(
                 serializer.to_representation(group), status=status.HTTP_201_CREATED
@@ -106,7 +120,7 @@ class GroupDetailView(APIView):
             # Invalidate cache for this specific group detail
             cache.delete(f"group_detail_{group_id}")
             # Invalidate groups list cache
-            cache.delete("groups_list")
+            groups_list_cache.invalidate()
             
             response_serializer = GroupDetailSerializer(updated_group)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -124,6 +138,6 @@ class GroupDetailView(APIView):
         # Invalidate cache for this specific group detail
         cache.delete(f"group_detail_{group_id}")
         # Invalidate groups list cache
-        cache.delete("groups_list")
+        groups_list_cache.invalidate()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
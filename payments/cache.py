@@ -0,0 +1,4 @@
+from DicoEvent.cache import CacheNamespace
+
+# Every cached page of the payment list, invalidated as a whole on writes
+payments_list_cache = CacheNamespace("payments_list")
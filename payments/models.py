@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from registrations.models import Registration
 import uuid
 
@@ -35,3 +37,26 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="payment_created_id_idx"),
+        ]
+
+
+@receiver(post_save, sender=Payment)
+def handle_payment_status(sender, instance, **kwargs):
+    """
+    A cancelled or failed payment cancels its registration while it is an
+    unpaid hold and gives the seat back (to the waitlist, if any).
+    Confirmed registrations keep their seat, and saving such a payment
+    again releases nothing.
+    """
+    if instance.payment_status not in ("cancelled", "failed"):
+        return
+
+    from django.core.cache import cache
+    from registrations.services import reservation_service
+    from registrations.cache import registrations_list_cache
+
+    if reservation_service.cancel_unpaid_hold(instance.registration_id):
+        cache.delete(f"registration_detail_{instance.registration_id}")
+        registrations_list_cache.invalidate()
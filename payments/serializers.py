@@ -1,8 +1,32 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from rest_framework import serializers
 from registrations.models import Registration
+from registrations.services import reservation_service
 from .models import Payment
 
 
+def confirm_registration(registration_id):
+    """
+    Confirm the seat hold a completed payment pays for, within the
+    caller's transaction, so a payment on an expired hold is not saved.
+    """
+    try:
+        confirmed = reservation_service.confirm(registration_id)
+    except ValidationError as e:
+        raise serializers.ValidationError({"registration_id": e.messages})
+
+    if confirmed:
+        from registrations.cache import registrations_list_cache
+
+        def invalidate():
+            cache.delete(f"registration_detail_{registration_id}")
+            registrations_list_cache.invalidate()
+
+        transaction.on_commit(invalidate)
+
+
 class PaymentCreateSerializer(serializers.ModelSerializer):
     registration_id = serializers.UUIDField(write_only=True)
 
@@ -21,13 +45,18 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
         registration_id = validated_data.pop("registration_id")
         registration = Registration.objects.get(id=registration_id)
 
-        payment = Payment.objects.create(registration=registration, **validated_data)
+        with transaction.atomic():
+            payment = Payment.objects.create(
+                registration=registration, **validated_data
+            )
+            if payment.payment_status == "completed":
+                confirm_registration(registration.id)
         return payment
 
     def to_representation(self, instance):
         return {
             "id": str(instance.id),
-            "registration": str(instance.registration.id),
+            "registration": str(instance.registration_id),
             "payment_method": instance.payment_method,
             "payment_status": instance.payment_status,
             "amount_paid": str(instance.amount_paid),
@@ -51,7 +80,7 @@ class PaymentListSerializer(serializers.ModelSerializer):
 
     def get_registration(self, obj):
         return {
-            "id": str(obj.registration.id),
+            "id": str(obj.registration_id),
             "user": obj.registration.user.username,
             "ticket": obj.registration.ticket.name,
         }
@@ -84,7 +113,7 @@ class PaymentDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_registration(self, obj):
-        return str(obj.registration.id)
+        return str(obj.registration_id)
 
     def to_representation(self, instance):
         return {
@@ -122,13 +151,16 @@ class PaymentUpdateSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save()
+        with transaction.atomic():
+            instance.save()
+            if instance.payment_status == "completed":
+                confirm_registration(instance.registration_id)
         return instance
 
     def to_representation(self, instance):
         return {
             "id": str(instance.id),
-            "registration": str(instance.registration.id),
+            "registration": str(instance.registration_id),
             "payment_method": instance.payment_method,
             "payment_status": instance.get_payment_status_display(),
             "amount_paid": str(instance.amount_paid),
@@ -1,3 +1,98 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APITestCase
+from DicoEvent.testing import (
+    QueryBudgetMixin,
+    create_event,
+    create_registrations,
+    create_ticket,
+    create_users,
+)
+from registrations.models import Registration
+from registrations.services import reservation_service
+from .models import Payment
 
-# Create your tests here.
+User = get_user_model()
+
+
+class PaymentListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """The payment list runs a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        ticket = create_ticket(create_event(organizer))
+        registrations = create_registrations(ticket, create_users(60, "attendee"))
+        Payment.objects.bulk_create(
+            [
+                Payment(
+                    registration=registration,
+                    payment_method="CASH",
+                    payment_status="pending",
+                    amount_paid=10,
+                )
+                for registration in registrations
+            ]
+        )
+        cls.admin = User.objects.create_superuser(username="admin", password="secret")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_query_budget(self):
+        # The page, plus the role lookup of the permission check
+        with self.assertMaxQueries(2):
+            response = self.client.get("/api/payments/")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["payments"]), settings.LIST_PAGE_SIZE)
+
+
+class FailedPaymentTests(TestCase):
+    """A failed or cancelled payment only gives back the seat of an unpaid hold."""
+
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        self.ticket = create_ticket(create_event(organizer))
+        self.user = create_users(1, "attendee")[0]
+
+    def hold(self, **fields):
+        reservation_service.reserve(self.ticket.id)
+        return Registration.objects.create(
+            ticket=self.ticket, user=self.user, status=Registration.HELD, **fields
+        )
+
+    def pay(self, registration, payment_status):
+        return Payment.objects.create(
+            registration=registration,
+            payment_method="QRIS",
+            payment_status=payment_status,
+            amount_paid=self.ticket.price,
+        )
+
+    def assertStatus(self, registration, status, sold):
+        registration.refresh_from_db()
+        self.ticket.refresh_from_db()
+        self.assertEqual(registration.status, status)
+        self.assertEqual(self.ticket.sold, sold)
+
+    def test_failed_payment_cancels_the_hold(self):
+        registration = self.hold()
+        self.pay(registration, "failed")
+        self.assertStatus(registration, Registration.CANCELLED, 0)
+
+    def test_failed_payment_keeps_a_confirmed_registration(self):
+        registration = self.hold()
+        self.pay(registration, "completed")
+        reservation_service.confirm(registration.id)
+        self.pay(registration, "cancelled")
+        self.assertStatus(registration, Registration.CONFIRMED, 1)
+
+    def test_failed_retry_keeps_a_paid_hold(self):
+        # Paid, but not confirmed yet
+        registration = self.hold()
+        self.pay(registration, "completed")
+        self.pay(registration, "failed")
+        self.assertStatus(registration, Registration.HELD, 1)
@@ -3,7 +3,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.core.cache import cache
 from django.conf import settings
+from DicoEvent.pagination import InvalidCursor, keyset_page_data, stream_ndjson
 from users.permissions import IsAdminOrSuperUser, IsAuthenticatedUser
+from .cache import payments_list_cache
 from .models import Payment
 from .serializers import (
     PaymentCreateSerializer,
@@ -20,9 +22,18 @@ class PaymentsView(APIView):
         return [IsAuthenticatedUser()]
 
     def get(self, request):
+        payments = Payment.objects.select_related(
+            "registration__user", "registration__ticket"
+        )
+
+        if request.GET.get("stream") == "ndjson":
+            return stream_ndjson(payments, PaymentListSerializer)
+
+        cursor = request.GET.get("cursor")
+
         # Try to get from cache first
-        cache_key = "payments_list"
-        cached_data = cache.get(cache_key)
+        cache_key = f"cursor_{cursor or ''}"
+        cached_data = payments_list_cache.get(cache_key)
         
         if cached_data:
             # Return cached data with X-Data-Source header
@@ -30,13 +41,16 @@ class PaymentsView(APIView):
             response['X-Data-Source'] = 'cache'
             return response
         
-        # If not in cache, get from database
-        payments = Payment.objects.all()
-        serializer = PaymentListSerializer(payments, many=True)
-        data = {"payments": serializer.data}
+        # If not in cache, get one page from database
+        try:
+            data = keyset_page_data(payments, cursor, PaymentListSerializer, "payments")
+        except InvalidCursor:
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Cache the data for 1 hour
-        cache.set(cache_key, data, settings.CACHE_TTL)
+        payments_list_cache.set(cache_key, data)
         
         # Return fresh data with X-Data-Source header
         response = Response(data, status=status.HTTP_200_OK)
@@ -49,7 +63,7 @@ class PaymentsView(APIView):
             payment = serializer.save()
             
             # Invalidate payments list cache
-            cache.delete("payments_list")
+            payments_list_cache.invalidate()
             
             return Response(
                 serializer.to_representation(payment), status=status.HTTP_201_CREATED
@@ -112,7 +126,7 @@ class PaymentDetailView(APIView):
             # Invalidate cache for this specific payment detail
             cache.delete(f"payment_detail_{payment_id}")
             # Invalidate payments list cache
-            cache.delete("payments_list")
+            payments_list_cache.invalidate()
             
             response_serializer = PaymentDetailSerializer(updated_payment)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -130,6 +144,6 @@ class PaymentDetailView(APIView):
         # Invalidate cache for this specific payment detail
         cache.delete(f"payment_detail_{payment_id}")
         # Invalidate payments list cache
-        cache.delete("payments_list")
+        payments_list_cache.invalidate()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
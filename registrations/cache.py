@@ -0,0 +1,4 @@
+from DicoEvent.cache import CacheNamespace
+
+# Every cached page of the registration list, invalidated as a whole on writes
+registrations_list_cache = CacheNamespace("registrations_list")
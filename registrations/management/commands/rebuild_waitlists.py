@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from registrations.models import WaitlistEntry
+from registrations.waitlist import waitlist
+
+
+class Command(BaseCommand):
+    help = "Restore the Redis waitlist queues from the waiting entries in the database"
+
+    def handle(self, *args, **options):
+        count = waitlist.rebuild(WaitlistEntry.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Queued {count} waitlist entries"))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="registration",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="registration_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0002_registration_registration_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="registration",
+            name="status",
+            field=models.CharField(
+                choices=[("confirmed", "Confirmed"), ("cancelled", "Cancelled")],
+                default="confirmed",
+                max_length=20,
+            ),
+        ),
+    ]
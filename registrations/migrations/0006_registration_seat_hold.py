@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0005_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="registration",
+            name="hold_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="registration",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("held", "Held"),
+                    ("confirmed", "Confirmed"),
+                    ("cancelled", "Cancelled"),
+                    ("expired", "Expired"),
+                ],
+                default="confirmed",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="registration",
+            index=models.Index(
+                condition=models.Q(("status", "held")),
+                fields=["hold_expires_at"],
+                name="registration_hold_expiry_idx",
+            ),
+        ),
+    ]
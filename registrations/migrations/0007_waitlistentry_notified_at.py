@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0006_registration_seat_hold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="waitlistentry",
+            name="notified_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from tickets.models import Ticket
 import uuid
@@ -9,6 +9,21 @@ User = get_user_model()
 
 
 class Registration(models.Model):
+    # A paid ticket is held until its payment completes, which confirms the
+    # registration, or until the hold expires. Held and confirmed
+    # registrations take a seat; cancelled and expired ones do not.
+    HELD = "held"
+    CONFIRMED = "confirmed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+    STATUS_CHOICES = [
+        (HELD, "Held"),
+        (CONFIRMED, "Confirmed"),
+        (CANCELLED, "Cancelled"),
+        (EXPIRED, "Expired"),
+    ]
+    SEAT_STATUSES = (HELD, CONFIRMED)
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     ticket = models.ForeignKey(
         Ticket, on_delete=models.CASCADE, related_name="registrations"
@@ -16,6 +31,10 @@ class Registration(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="registrations"
     )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=CONFIRMED
+    )
+    hold_expires_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -24,15 +43,146 @@ class Registration(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"], name="registration_created_id_idx"
+            ),
+            # Lets the hold sweeper read only the holds, by expiry time
+            models.Index(
+                fields=["hold_expires_at"],
+                name="registration_hold_expiry_idx",
+                condition=models.Q(status="held"),
+            ),
+        ]
         unique_together = ["ticket", "user"]  # Prevent duplicate registrations
 
 
+class WaitlistEntry(models.Model):
+    """
+    A user queued for a sold-out ticket. Postgres keeps the entries; the
+    queue order lives in Redis (see registrations.waitlist).
+    """
+
+    WAITING = "waiting"
+    PROMOTED = "promoted"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (WAITING, "Waiting"),
+        (PROMOTED, "Promoted"),
+        (CANCELLED, "Cancelled"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ticket = models.ForeignKey(
+        Ticket, on_delete=models.CASCADE, related_name="waitlist_entries"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="waitlist_entries"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=WAITING)
+    registration = models.OneToOneField(
+        Registration,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="waitlist_entry",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(blank=True, null=True)
+    # Claimed before the promotion email goes out, so a redelivered task
+    # does not email the user twice
+    notified_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.user.username} waiting for {self.ticket.name}"
+
+    class Meta:
+        ordering = ["created_at"]
+        constraints = [
+            # A user waits at most once per ticket
+            models.UniqueConstraint(
+                fields=["ticket", "user"],
+                condition=models.Q(status="waiting"),
+                name="waitlist_one_waiting_entry",
+            ),
+        ]
+        indexes = [
+            # Rebuilds the Redis queues in FIFO order
+            models.Index(
+                fields=["ticket", "created_at"],
+                name="waitlist_waiting_idx",
+                condition=models.Q(status="waiting"),
+            ),
+        ]
+
+
+class OutboxMessageManager(models.Manager):
+    def enqueue(self, task, *args, **kwargs):
+        """
+        Record a Celery task to run once the current transaction commits.
+
+        The row is written in the caller's transaction, so the task is
+        dropped with a rollback and kept with a commit, without touching
+        the broker on the request path. ``relay_outbox`` publishes it.
+
+        Args:
+            task: Registered name of the Celery task
+            *args, **kwargs: JSON-serializable task arguments
+        """
+        return self.create(task=task, args=list(args), kwargs=kwargs)
+
+
+class OutboxMessage(models.Model):
+    """A Celery task waiting to be published by the outbox relay."""
+
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OutboxMessageManager()
+
+    def __str__(self):
+        return f"{self.task} ({'published' if self.published_at else 'pending'})"
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # The relay only ever reads the pending messages, oldest first
+            models.Index(
+                fields=["id"],
+                name="outbox_pending_idx",
+                condition=models.Q(published_at__isnull=True),
+            ),
+        ]
+
+
 @receiver(post_save, sender=Registration)
 def handle_new_registration(sender, instance, created, **kwargs):
     """
     Send reminder email when new registration is created, if event is within 2 hours
     """
-    if created:  # Only for new registrations
-        from events.tasks import send_reminder_for_new_registration
-        # Trigger the task asynchronously
-        send_reminder_for_new_registration.delay(str(instance.id))
+    # Held registrations are checked once their payment confirms them
+    if created and instance.status == Registration.CONFIRMED:
+        # Published by the outbox relay once the registration is committed
+        OutboxMessage.objects.enqueue(
+            "events.tasks.send_reminder_for_new_registration", str(instance.id)
+        )
+
+
+@receiver(post_delete, sender=Registration)
+def handle_deleted_registration(sender, instance, **kwargs):
+    """
+    Give the registration's seat back to its ticket and event. Also covers
+    registrations removed by cascade when a user or ticket is deleted.
+    Cancelled and expired registrations gave their seat back already.
+    """
+    if instance.status not in Registration.SEAT_STATUSES:
+        return
+
+    from .services import reservation_service
+
+    reservation_service.release(instance.ticket_id)
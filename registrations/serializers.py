@@ -1,7 +1,15 @@
+from collections import Counter, defaultdict
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from tickets.models import Ticket
-from .models import Registration
+from .models import OutboxMessage, Registration, WaitlistEntry
+from .services import reservation_service
+from .waitlist import waitlist
 
 User = get_user_model()
 
@@ -32,8 +40,10 @@ class RegistrationCreateSerializer(serializers.ModelSerializer):
         ticket_id = attrs["ticket_id"]
         user_id = attrs["user_id"]
 
-        # Check if registration already exists
-        if Registration.objects.filter(ticket_id=ticket_id, user_id=user_id).exists():
+        # Check if registration already exists (a cancelled or expired one is rebooked)
+        if Registration.objects.filter(
+            ticket_id=ticket_id, user_id=user_id, status__in=Registration.SEAT_STATUSES
+        ).exists():
             raise serializers.ValidationError(
                 "User is already registered for this ticket."
             )
@@ -44,10 +54,43 @@ class RegistrationCreateSerializer(serializers.ModelSerializer):
         ticket_id = validated_data.pop("ticket_id")
         user_id = validated_data.pop("user_id")
 
-        ticket = Ticket.objects.get(id=ticket_id)
-        user = User.objects.get(id=user_id)
-
-        registration = Registration.objects.create(ticket=ticket, user=user)
+        try:
+            with transaction.atomic():
+                # Locks a cancelled or expired registration to rebook, so
+                # concurrent requests for the pair reserve one seat only
+                registration = (
+                    Registration.objects.select_for_update()
+                    .filter(ticket_id=ticket_id, user_id=user_id)
+                    .first()
+                )
+                if (
+                    registration is not None
+                    and registration.status in Registration.SEAT_STATUSES
+                ):
+                    # Rebooked in the meantime
+                    raise ValidationError("User is already registered for this ticket.")
+
+                reservation_service.reserve(ticket_id)
+                state = reservation_service.new_registration_state(
+                    Ticket.objects.values_list("price", flat=True).get(id=ticket_id)
+                )
+                if registration is None:
+                    registration = Registration.objects.create(
+                        ticket_id=ticket_id, user_id=user_id, **state
+                    )
+                else:
+                    registration.status = state["status"]
+                    registration.hold_expires_at = state["hold_expires_at"]
+                    registration.save(
+                        update_fields=["status", "hold_expires_at", "updated_at"]
+                    )
+        except ValidationError as e:
+            raise serializers.ValidationError({"ticket_id": e.messages})
+        except IntegrityError:
+            # Lost a race against a concurrent registration for the same pair
+            raise serializers.ValidationError(
+                "User is already registered for this ticket."
+            )
         return registration
 
     def to_representation(self, instance):
@@ -55,9 +98,164 @@ class RegistrationCreateSerializer(serializers.ModelSerializer):
             "id": str(instance.id),
             "ticket": instance.ticket.name,
             "user": instance.user.username,
+            "status": instance.status,
+            "hold_expires_at": (
+                instance.hold_expires_at.isoformat()
+                if instance.hold_expires_at
+                else None
+            ),
         }
 
 
+class RegistrationPairSerializer(serializers.Serializer):
+    ticket_id = serializers.UUIDField()
+    user_id = serializers.UUIDField()
+
+
+class RegistrationBulkCreateSerializer(serializers.Serializer):
+    """
+    Register many (ticket, user) pairs in one request.
+
+    Validation costs a fixed number of queries whatever the batch size:
+    one IN query per referenced table plus one for existing registrations.
+    """
+
+    registrations = RegistrationPairSerializer(many=True, allow_empty=False)
+
+    def validate_registrations(self, value):
+        if len(value) > settings.REGISTRATION_BULK_MAX:
+            raise serializers.ValidationError(
+                f"At most {settings.REGISTRATION_BULK_MAX} registrations per request."
+            )
+
+        pairs = [(item["ticket_id"], item["user_id"]) for item in value]
+        if len(set(pairs)) != len(pairs):
+            raise serializers.ValidationError("Duplicate ticket and user pairs.")
+
+        ticket_ids = {ticket_id for ticket_id, _ in pairs}
+        user_ids = {user_id for _, user_id in pairs}
+
+        self.ticket_prices = dict(
+            Ticket.objects.filter(id__in=ticket_ids).values_list("id", "price")
+        )
+        missing_tickets = ticket_ids - set(self.ticket_prices)
+        if missing_tickets:
+            raise serializers.ValidationError(
+                f"Tickets not found: {', '.join(sorted(map(str, missing_tickets)))}."
+            )
+        missing_users = user_ids - set(
+            User.objects.filter(id__in=user_ids).values_list("id", flat=True)
+        )
+        if missing_users:
+            raise serializers.ValidationError(
+                f"Users not found: {', '.join(sorted(map(str, missing_users)))}."
+            )
+
+        # One query over the cross product of tickets and users; pairs
+        # outside the batch are filtered out here
+        requested = set(pairs)
+        existing = {}
+        for registration_id, ticket_id, user_id, status in Registration.objects.filter(
+            ticket_id__in=ticket_ids, user_id__in=user_ids
+        ).values_list("id", "ticket_id", "user_id", "status"):
+            if (ticket_id, user_id) in requested:
+                existing[(ticket_id, user_id)] = (registration_id, status)
+
+        registered = [
+            pair
+            for pair, (_, status) in existing.items()
+            if status in Registration.SEAT_STATUSES
+        ]
+        if registered:
+            raise serializers.ValidationError(
+                "Users already registered: "
+                + ", ".join(
+                    f"{user_id} for ticket {ticket_id}"
+                    for ticket_id, user_id in registered
+                )
+                + "."
+            )
+
+        # Cancelled and expired registrations are rebooked instead of inserted again
+        self.rebooked_ids = {
+            pair: registration_id for pair, (registration_id, _) in existing.items()
+        }
+        return value
+
+    def create(self, validated_data):
+        pairs = [
+            (item["ticket_id"], item["user_id"])
+            for item in validated_data["registrations"]
+        ]
+
+        try:
+            with transaction.atomic():
+                # Lock the registrations to rebook, in ID order, before any
+                # seat is taken; one rebooked by a concurrent request fails
+                # the batch instead of reserving its seat twice
+                rebooked_ids = sorted(self.rebooked_ids.values())
+                locked = list(
+                    Registration.objects.select_for_update()
+                    .filter(
+                        id__in=rebooked_ids,
+                        status__in=[Registration.CANCELLED, Registration.EXPIRED],
+                    )
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+                if len(locked) != len(rebooked_ids):
+                    raise ValidationError(
+                        "A user is already registered for one of the tickets."
+                    )
+
+                reservation_service.reserve_many(
+                    Counter(ticket_id for ticket_id, _ in pairs)
+                )
+
+                # Paid tickets are held until paid, free ones confirmed
+                states = {
+                    ticket_id: reservation_service.new_registration_state(price)
+                    for ticket_id, price in self.ticket_prices.items()
+                }
+
+                rebooked_by_ticket = defaultdict(list)
+                for (ticket_id, _), registration_id in self.rebooked_ids.items():
+                    rebooked_by_ticket[ticket_id].append(registration_id)
+                for ticket_id, ids in rebooked_by_ticket.items():
+                    Registration.objects.filter(id__in=ids).update(
+                        updated_at=timezone.now(), **states[ticket_id]
+                    )
+
+                # bulk_create skips post_save, so no per-row reminder task
+                created = Registration.objects.bulk_create(
+                    [
+                        Registration(
+                            ticket_id=ticket_id, user_id=user_id, **states[ticket_id]
+                        )
+                        for ticket_id, user_id in pairs
+                        if (ticket_id, user_id) not in self.rebooked_ids
+                    ],
+                    batch_size=1000,
+                )
+                registration_ids = [str(registration.id) for registration in created]
+                registration_ids += [
+                    str(registration_id) for registration_id in rebooked_ids
+                ]
+
+                OutboxMessage.objects.enqueue(
+                    "events.tasks.send_reminders_for_new_registrations",
+                    registration_ids,
+                )
+        except ValidationError as e:
+            raise serializers.ValidationError({"registrations": e.messages})
+        except IntegrityError:
+            # Lost a race against a concurrent registration for a pair
+            raise serializers.ValidationError(
+                "A user is already registered for one of the tickets."
+            )
+        return registration_ids
+
+
 class RegistrationListSerializer(serializers.ModelSerializer):
     ticket = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
@@ -65,7 +263,7 @@ class RegistrationListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Registration
-        fields = ["id", "ticket", "user", "event", "created_at", "updated_at"]
+        fields = ["id", "ticket", "user", "event", "status", "created_at", "updated_at"]
 
     def get_ticket(self, obj):
         return {
@@ -86,65 +284,12 @@ class RegistrationListSerializer(serializers.ModelSerializer):
             "ticket": self.get_ticket(instance),
             "user": self.get_user(instance),
             "event": self.get_event(instance),
+            "status": instance.status,
             "created_at": instance.created_at.isoformat(),
             "updated_at": instance.updated_at.isoformat(),
         }
 
 
-class RegistrationUpdateSerializer(serializers.ModelSerializer):
-    ticket_id = serializers.UUIDField(write_only=True)
-    user_id = serializers.UUIDField(write_only=True)
-
-    class Meta:
-        model = Registration
-        fields = ["ticket_id", "user_id"]
-
-    def validate_ticket_id(self, value):
-        try:
-            Ticket.objects.get(id=value)
-            return value
-        except Ticket.DoesNotExist:
-            raise serializers.ValidationError("Ticket not found.")
-
-    def validate_user_id(self, value):
-        try:
-            User.objects.get(id=value)
-            return value
-        except User.DoesNotExist:
-            raise serializers.ValidationError("User not found.")
-
-    def validate(self, attrs):
-        ticket_id = attrs["ticket_id"]
-        user_id = attrs["user_id"]
-
-        # Check if registration already exists for different registration
-        existing_registration = Registration.objects.filter(
-            ticket_id=ticket_id, user_id=user_id
-        ).exclude(id=self.instance.id if self.instance else None)
-
-        if existing_registration.exists():
-            raise serializers.ValidationError(
-                "User is already registered for this ticket."
-            )
-
-        return attrs
-
-    def update(self, instance, validated_data):
-        ticket_id = validated_data.pop("ticket_id", None)
-        user_id = validated_data.pop("user_id", None)
-
-        if ticket_id:
-            ticket = Ticket.objects.get(id=ticket_id)
-            instance.ticket = ticket
-
-        if user_id:
-            user = User.objects.get(id=user_id)
-            instance.user = user
-
-        instance.save()
-        return instance
-
-
 class RegistrationDetailSerializer(serializers.ModelSerializer):
     ticket = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
@@ -152,7 +297,7 @@ class RegistrationDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Registration
-        fields = ["id", "ticket", "user", "event", "created_at", "updated_at"]
+        fields = ["id", "ticket", "user", "event", "status", "created_at", "updated_at"]
 
     def get_ticket(self, obj):
         return obj.ticket.name
@@ -169,6 +314,7 @@ class RegistrationDetailSerializer(serializers.ModelSerializer):
             "ticket": self.get_ticket(instance),
             "user": self.get_user(instance),
             "event": self.get_event(instance),
+            "status": instance.status,
             "created_at": instance.created_at.isoformat(),
             "updated_at": instance.updated_at.isoformat(),
         }
@@ -201,8 +347,9 @@ class RegistrationUpdateSerializer(serializers.ModelSerializer):
         user_id = attrs["user_id"]
 
         # Check if registration already exists for different registration
+        # (a cancelled or expired one is replaced, see update)
         existing_registration = Registration.objects.filter(
-            ticket_id=ticket_id, user_id=user_id
+            ticket_id=ticket_id, user_id=user_id, status__in=Registration.SEAT_STATUSES
         ).exclude(id=self.instance.id if self.instance else None)
 
         if existing_registration.exists():
@@ -216,13 +363,95 @@ class RegistrationUpdateSerializer(serializers.ModelSerializer):
         ticket_id = validated_data.pop("ticket_id", None)
         user_id = validated_data.pop("user_id", None)
 
-        if ticket_id:
-            ticket = Ticket.objects.get(id=ticket_id)
-            instance.ticket = ticket
+        try:
+            with transaction.atomic():
+                if ticket_id and ticket_id != instance.ticket_id:
+                    # A cancelled or expired registration holds no seat to move
+                    if instance.status in Registration.SEAT_STATUSES:
+                        reservation_service.move(instance.ticket_id, ticket_id)
+                    ticket = Ticket.objects.get(id=ticket_id)
+                    instance.ticket = ticket
+
+                if user_id:
+                    user = User.objects.get(id=user_id)
+                    instance.user = user
+
+                self._replace_stale_registration(instance)
+                instance.save()
+        except ValidationError as e:
+            raise serializers.ValidationError({"ticket_id": e.messages})
+        return instance
 
-        if user_id:
-            user = User.objects.get(id=user_id)
-            instance.user = user
+    def _replace_stale_registration(self, instance):
+        """
+        Delete the cancelled or expired registration the user may still
+        have for the target ticket, which holds no seat but would break
+        the (ticket, user) uniqueness. Its payments move to the instance.
+        """
+        stale = (
+            Registration.objects.select_for_update()
+            .filter(ticket_id=instance.ticket_id, user_id=instance.user_id)
+            .exclude(id=instance.id)
+            .first()
+        )
+        if stale is None:
+            return
+        if stale.status in Registration.SEAT_STATUSES:
+            # Registered in the meantime
+            raise ValidationError("User is already registered for this ticket.")
+
+        stale_id = stale.id
+        stale.payments.update(registration=instance)
+        stale.delete()
+        transaction.on_commit(lambda: cache.delete(f"registration_detail_{stale_id}"))
+
+
+class WaitlistJoinSerializer(serializers.Serializer):
+    # Plain Serializer: DRF cannot introspect the conditional unique
+    # constraint on WaitlistEntry; waitlist.join enforces it instead
+    ticket_id = serializers.UUIDField(write_only=True)
+    user_id = serializers.UUIDField(write_only=True)
 
-        instance.save()
-        return instance
+    def validate_ticket_id(self, value):
+        if not Ticket.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Ticket not found.")
+        return value
+
+    def validate_user_id(self, value):
+        if not User.objects.filter(id=value).exists():
+            raise serializers.ValidationError("User not found.")
+        return value
+
+    def create(self, validated_data):
+        try:
+            return waitlist.join(validated_data["ticket_id"], validated_data["user_id"])
+        except ValidationError as e:
+            raise serializers.ValidationError({"ticket_id": e.messages})
+
+    def to_representation(self, instance):
+        return WaitlistEntrySerializer(instance).data
+
+
+class WaitlistEntrySerializer(serializers.Serializer):
+    position = serializers.SerializerMethodField()
+
+    def get_position(self, obj):
+        if obj.status != WaitlistEntry.WAITING:
+            return None
+        return waitlist.position(obj)
+
+    def to_representation(self, instance):
+        return {
+            "id": str(instance.id),
+            "ticket": str(instance.ticket_id),
+            "user": str(instance.user_id),
+            "status": instance.status,
+            "position": self.get_position(instance),
+            "registration": (
+                str(instance.registration_id) if instance.registration_id else None
+            ),
+            "created_at": instance.created_at.isoformat(),
+            "promoted_at": (
+                instance.promoted_at.isoformat() if instance.promoted_at else None
+            ),
+        }
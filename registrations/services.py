@@ -0,0 +1,489 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from loguru import logger
+from DicoEvent import cache as async_cache
+from events.models import Event
+from tickets.models import Ticket
+from .models import OutboxMessage, Registration
+
+
+class ReservationService:
+    """
+    Seat accounting for tickets and their events.
+
+    The ``sold`` counters on ``Ticket`` and ``Event`` are the authoritative
+    record of taken seats. Every change is a single conditional UPDATE, so
+    concurrent registrations queue on the row lock and re-check the quota
+    instead of racing on a read-then-write. Rows are always locked ticket
+    first, then event, to keep concurrent reservations deadlock-free.
+    Committed changes are mirrored to ``seat_availability``.
+    """
+
+    def reserve(self, ticket_id, seats=1):
+        """
+        Reserve seats on a ticket and on the event it belongs to.
+
+        Args:
+            ticket_id: ID of the ticket to reserve seats on
+            seats: Number of seats to reserve
+
+        Raises:
+            ValidationError: If the ticket or its event has no seats left
+        """
+        with transaction.atomic():
+            reserved = Ticket.objects.filter(
+                id=ticket_id, sold__lte=F("quota") - seats
+            ).update(sold=F("sold") + seats)
+            if not reserved:
+                logger.info(f"Ticket {ticket_id} is sold out")
+                raise ValidationError("Ticket is sold out.")
+
+            event_id = _event_id(ticket_id)
+            reserved = Event.objects.filter(
+                id=event_id, sold__lte=F("quota") - seats
+            ).update(sold=F("sold") + seats)
+            if not reserved:
+                # Leaving the atomic block rolls back the ticket reservation
+                logger.info(f"Event for ticket {ticket_id} is sold out")
+                raise ValidationError("Event is sold out.")
+
+            seat_availability.adjust_on_commit("ticket", ticket_id, seats)
+            seat_availability.adjust_on_commit("event", event_id, seats)
+
+    def reserve_many(self, seats_by_ticket):
+        """
+        Reserve seats on several tickets at once, all or nothing.
+
+        Each event's tickets are locked in ID order and then the event,
+        taking the seats of all its tickets in one UPDATE. Events are also
+        visited in ID order, so concurrent bulk reservations (and single
+        ones, which lock one ticket then its event) acquire rows in the
+        same order and cannot deadlock.
+
+        Args:
+            seats_by_ticket: Mapping of ticket ID to number of seats
+
+        Raises:
+            ValidationError: If any ticket or event has too few seats left
+        """
+        event_by_ticket = dict(
+            Ticket.objects.filter(id__in=seats_by_ticket).values_list("id", "event_id")
+        )
+        tickets_by_event = defaultdict(list)
+        for ticket_id, event_id in event_by_ticket.items():
+            tickets_by_event[event_id].append(ticket_id)
+
+        with transaction.atomic():
+            for event_id in sorted(tickets_by_event):
+                event_seats = 0
+                for ticket_id in sorted(tickets_by_event[event_id]):
+                    seats = seats_by_ticket[ticket_id]
+                    reserved = Ticket.objects.filter(
+                        id=ticket_id, sold__lte=F("quota") - seats
+                    ).update(sold=F("sold") + seats)
+                    if not reserved:
+                        logger.info(
+                            f"Ticket {ticket_id} has fewer than {seats} seats left"
+                        )
+                        raise ValidationError(
+                            f"Ticket {ticket_id} has fewer than {seats} seats left."
+                        )
+                    seat_availability.adjust_on_commit("ticket", ticket_id, seats)
+                    event_seats += seats
+
+                reserved = Event.objects.filter(
+                    id=event_id, sold__lte=F("quota") - event_seats
+                ).update(sold=F("sold") + event_seats)
+                if not reserved:
+                    logger.info(
+                        f"Event {event_id} has fewer than {event_seats} seats left"
+                    )
+                    raise ValidationError(
+                        f"Event {event_id} has fewer than {event_seats} seats left."
+                    )
+                seat_availability.adjust_on_commit("event", event_id, event_seats)
+
+    def release(self, ticket_id, seats=1):
+        """
+        Give seats back to a ticket and to the event it belongs to.
+
+        Args:
+            ticket_id: ID of the ticket to release seats from
+            seats: Number of seats to release
+        """
+        # Imported here: the waitlist itself reserves through this service
+        from .waitlist import waitlist
+
+        with transaction.atomic():
+            if Ticket.objects.filter(id=ticket_id, sold__gte=seats).update(
+                sold=F("sold") - seats
+            ):
+                seat_availability.adjust_on_commit("ticket", ticket_id, -seats)
+                # Offer the seat to the ticket's waitlist
+                waitlist.flag_on_commit(ticket_id)
+
+            event_id = _event_id(ticket_id)
+            if Event.objects.filter(id=event_id, sold__gte=seats).update(
+                sold=F("sold") - seats
+            ):
+                seat_availability.adjust_on_commit("event", event_id, -seats)
+
+    def release_many(self, seats_by_ticket):
+        """
+        Give seats back to several tickets and their events, in the same
+        lock order as ``reserve_many``.
+
+        Args:
+            seats_by_ticket: Mapping of ticket ID to number of seats
+        """
+        from .waitlist import waitlist
+
+        event_by_ticket = dict(
+            Ticket.objects.filter(id__in=seats_by_ticket).values_list("id", "event_id")
+        )
+        tickets_by_event = defaultdict(list)
+        for ticket_id, event_id in event_by_ticket.items():
+            tickets_by_event[event_id].append(ticket_id)
+
+        with transaction.atomic():
+            for event_id in sorted(tickets_by_event):
+                event_seats = 0
+                for ticket_id in sorted(tickets_by_event[event_id]):
+                    seats = seats_by_ticket[ticket_id]
+                    if Ticket.objects.filter(id=ticket_id, sold__gte=seats).update(
+                        sold=F("sold") - seats
+                    ):
+                        seat_availability.adjust_on_commit("ticket", ticket_id, -seats)
+                        waitlist.flag_on_commit(ticket_id)
+                    event_seats += seats
+
+                if Event.objects.filter(id=event_id, sold__gte=event_seats).update(
+                    sold=F("sold") - event_seats
+                ):
+                    seat_availability.adjust_on_commit("event", event_id, -event_seats)
+
+    def move(self, from_ticket_id, to_ticket_id):
+        """
+        Move one seat from a ticket to another, all or nothing.
+
+        Rows are locked in the same order as ``reserve_many``: events in ID
+        order, each event's tickets in ID order and then the event. Within
+        one event the event's counter is left alone.
+
+        Args:
+            from_ticket_id: ID of the ticket giving the seat back
+            to_ticket_id: ID of the ticket taking it
+
+        Raises:
+            ValidationError: If the target ticket or its event is sold out
+        """
+        from .waitlist import waitlist
+
+        event_by_ticket = dict(
+            Ticket.objects.filter(id__in=[from_ticket_id, to_ticket_id]).values_list(
+                "id", "event_id"
+            )
+        )
+        seats_by_ticket = {from_ticket_id: -1, to_ticket_id: 1}
+        tickets_by_event = defaultdict(list)
+        for ticket_id, event_id in event_by_ticket.items():
+            tickets_by_event[event_id].append(ticket_id)
+
+        with transaction.atomic():
+            for event_id in sorted(tickets_by_event):
+                event_seats = 0
+                for ticket_id in sorted(tickets_by_event[event_id]):
+                    seats = seats_by_ticket[ticket_id]
+                    if seats > 0:
+                        if not Ticket.objects.filter(
+                            id=ticket_id, sold__lte=F("quota") - seats
+                        ).update(sold=F("sold") + seats):
+                            logger.info(f"Ticket {ticket_id} is sold out")
+                            raise ValidationError("Ticket is sold out.")
+                        seat_availability.adjust_on_commit("ticket", ticket_id, seats)
+                    elif Ticket.objects.filter(id=ticket_id, sold__gte=-seats).update(
+                        sold=F("sold") + seats
+                    ):
+                        seat_availability.adjust_on_commit("ticket", ticket_id, seats)
+                        waitlist.flag_on_commit(ticket_id)
+                    event_seats += seats
+
+                if event_seats > 0:
+                    if not Event.objects.filter(
+                        id=event_id, sold__lte=F("quota") - event_seats
+                    ).update(sold=F("sold") + event_seats):
+                        logger.info(f"Event {event_id} is sold out")
+                        raise ValidationError("Event is sold out.")
+                    seat_availability.adjust_on_commit("event", event_id, event_seats)
+                elif event_seats < 0:
+                    if Event.objects.filter(id=event_id, sold__gte=-event_seats).update(
+                        sold=F("sold") + event_seats
+                    ):
+                        seat_availability.adjust_on_commit(
+                            "event", event_id, event_seats
+                        )
+
+    def new_registration_state(self, ticket_price):
+        """
+        Get the status and hold expiry of a new registration.
+
+        Paid tickets are held for SEAT_HOLD_TTL seconds awaiting payment;
+        free tickets are confirmed straight away.
+        """
+        if not ticket_price:
+            return {"status": Registration.CONFIRMED, "hold_expires_at": None}
+        return {
+            "status": Registration.HELD,
+            "hold_expires_at": timezone.now()
+            + timedelta(seconds=settings.SEAT_HOLD_TTL),
+        }
+
+    def confirm(self, registration_id):
+        """
+        Confirm a held registration once its payment completed. A hold
+        stays confirmable until the sweeper has expired it.
+
+        Args:
+            registration_id: ID of the registration to confirm
+
+        Returns:
+            bool: False if the registration was confirmed already
+
+        Raises:
+            ValidationError: If the hold expired or the registration was cancelled
+        """
+        confirmed = Registration.objects.filter(
+            id=registration_id, status=Registration.HELD
+        ).update(
+            status=Registration.CONFIRMED,
+            hold_expires_at=None,
+            updated_at=timezone.now(),
+        )
+        if confirmed:
+            # The reminder check new confirmed registrations get on creation
+            OutboxMessage.objects.enqueue(
+                "events.tasks.send_reminder_for_new_registration", str(registration_id)
+            )
+            return True
+
+        status = (
+            Registration.objects.filter(id=registration_id)
+            .values_list("status", flat=True)
+            .first()
+        )
+        if status == Registration.CONFIRMED:
+            return False
+        if status == Registration.EXPIRED:
+            raise ValidationError("The seat hold has expired.")
+        raise ValidationError("The registration is cancelled.")
+
+    def expire_holds(self, limit):
+        """
+        Expire one batch of unpaid holds and release their seats.
+
+        The oldest expired holds are read through the partial index on
+        ``hold_expires_at`` and locked with SKIP LOCKED, so overlapping
+        sweepers split the work. Seats are released with one UPDATE per
+        ticket and per event of the batch.
+
+        Args:
+            limit: Maximum number of holds to expire
+
+        Returns:
+            int: Number of holds expired
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            expired = list(
+                Registration.objects.select_for_update(skip_locked=True)
+                .filter(status=Registration.HELD, hold_expires_at__lte=now)
+                .order_by("hold_expires_at")
+                .values_list("id", "ticket_id")[:limit]
+            )
+            if not expired:
+                return 0
+
+            Registration.objects.filter(
+                id__in=[registration_id for registration_id, _ in expired]
+            ).update(status=Registration.EXPIRED, hold_expires_at=None, updated_at=now)
+            self.release_many(Counter(ticket_id for _, ticket_id in expired))
+        return len(expired)
+
+    def cancel(self, registration_id):
+        """
+        Cancel a held or confirmed registration and give its seat back.
+
+        Args:
+            registration_id: ID of the registration to cancel
+
+        Returns:
+            bool: False if the registration held no seat (already
+            cancelled, expired or missing), so repeated calls release one
+            seat only
+        """
+        return self._cancel(
+            registration_id,
+            Registration.objects.filter(
+                id=registration_id, status__in=Registration.SEAT_STATUSES
+            ),
+        )
+
+    def cancel_unpaid_hold(self, registration_id):
+        """
+        Cancel a held registration after one of its payments failed or was
+        cancelled, and give its seat back. Confirmed registrations, and
+        holds with another payment that completed, keep their seat.
+
+        Args:
+            registration_id: ID of the registration to cancel
+
+        Returns:
+            bool: False if the registration was left alone
+        """
+        return self._cancel(
+            registration_id,
+            Registration.objects.filter(
+                id=registration_id, status=Registration.HELD
+            ).exclude(payments__payment_status="completed"),
+        )
+
+    def _cancel(self, registration_id, registrations):
+        with transaction.atomic():
+            ticket_id = registrations.values_list("ticket_id", flat=True).first()
+            if ticket_id is None:
+                return False
+
+            cancelled = registrations.update(
+                status=Registration.CANCELLED, hold_expires_at=None
+            )
+            if not cancelled:
+                # A concurrent call cancelled or confirmed it in the meantime
+                return False
+
+            self.release(ticket_id)
+        logger.info(f"Registration {registration_id} cancelled, seat released")
+        return True
+
+
+def _event_id(ticket_id):
+    return (
+        Ticket.objects.filter(id=ticket_id).values_list("event_id", flat=True).first()
+    )
+
+
+class SeatAvailability:
+    """
+    Live sold/remaining counts of tickets and events, served from Redis.
+
+    The ``sold`` columns in Postgres stay the source of truth; Redis keeps
+    a copy that ``ReservationService`` bumps after each committed change.
+    List and detail responses are cached for much longer than seats stay
+    unchanged, so views overlay the live counts onto every payload they
+    serve with a single MGET. Keys missing from Redis are loaded from
+    Postgres in one query, and ``reconcile_seat_counters`` repairs any
+    drift between the two.
+    """
+
+    models = {"ticket": Ticket, "event": Event}
+
+    def _key(self, kind, obj_id):
+        return f"seats_sold_{kind}_{obj_id}"
+
+    def adjust_on_commit(self, kind, obj_id, seats):
+        """Add ``seats`` (negative to subtract) once the transaction commits."""
+        transaction.on_commit(lambda: self.adjust(kind, obj_id, seats))
+
+    def adjust(self, kind, obj_id, seats):
+        try:
+            if seats >= 0:
+                cache.incr(self._key(kind, obj_id), seats)
+            else:
+                cache.decr(self._key(kind, obj_id), -seats)
+        except ValueError:
+            # Not cached: the next reader loads the count from Postgres
+            pass
+
+    def store(self, kind, sold_by_id):
+        """Write sold counts, keyed by object ID, to Redis."""
+        cache.set_many(
+            {self._key(kind, obj_id): sold for obj_id, sold in sold_by_id.items()},
+            settings.SEAT_COUNTER_TTL,
+        )
+
+    def _load(self, kind, ids):
+        sold_by_id = {
+            str(obj_id): sold
+            for obj_id, sold in self.models[kind]
+            .objects.filter(id__in=ids)
+            .values_list("id", "sold")
+        }
+        self.store(kind, sold_by_id)
+        return sold_by_id
+
+    def get_sold(self, kind, ids):
+        """
+        Get the sold count of each ticket or event.
+
+        Args:
+            kind: "ticket" or "event"
+            ids: IDs (as strings) of the objects to look up
+
+        Returns:
+            dict: ID -> sold, without the IDs that do not exist
+        """
+        keys = {self._key(kind, obj_id): obj_id for obj_id in ids}
+        sold_by_id = {keys[key]: sold for key, sold in cache.get_many(keys).items()}
+        missing = [obj_id for obj_id in ids if obj_id not in sold_by_id]
+        if missing:
+            sold_by_id.update(self._load(kind, missing))
+        return sold_by_id
+
+    async def aget_sold(self, kind, ids):
+        """Async variant of ``get_sold``."""
+        keys = {self._key(kind, obj_id): obj_id for obj_id in ids}
+        cached = await async_cache.aget_many(list(keys))
+        sold_by_id = {keys[key]: sold for key, sold in cached.items()}
+        missing = [obj_id for obj_id in ids if obj_id not in sold_by_id]
+        if missing:
+            sold_by_id.update(await sync_to_async(self._load)(kind, missing))
+        return sold_by_id
+
+    def _apply(self, rows, sold_by_id):
+        for row in rows:
+            sold = sold_by_id.get(row["id"])
+            if sold is not None:
+                row["sold"] = sold
+                row["remaining"] = max(row["quota"] - sold, 0)
+        return rows
+
+    def overlay(self, kind, rows):
+        """
+        Set live ``sold`` and ``remaining`` on serialized rows, in place.
+
+        Args:
+            kind: "ticket" or "event"
+            rows: Serialized objects with "id" and "quota" keys
+        """
+        if not rows:
+            return rows
+        return self._apply(rows, self.get_sold(kind, [row["id"] for row in rows]))
+
+    async def aoverlay(self, kind, rows):
+        """Async variant of ``overlay``."""
+        if not rows:
+            return rows
+        return self._apply(
+            rows, await self.aget_sold(kind, [row["id"] for row in rows])
+        )
+
+
+# Global instances
+reservation_service = ReservationService()
+seat_availability = SeatAvailability()
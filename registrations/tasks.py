@@ -0,0 +1,303 @@
+import time
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from loguru import logger
+from DicoEvent.metrics import WAITLIST_PROMOTION_LATENCY
+from events.models import Event
+from tickets.models import Ticket
+from .models import OutboxMessage, Registration, WaitlistEntry
+from .services import reservation_service, seat_availability
+from .waitlist import waitlist
+
+
+def _reconcile_batch(kind, model, count_field, after_id, batch_size):
+    """
+    Recount one batch of tickets or events and repair the drifted ones.
+
+    The batch rows are locked first, so reservations on them wait for the
+    recount instead of slipping between the COUNT and the UPDATE.
+
+    Returns:
+        tuple: (ID of the last row in the batch or None when done, rows repaired)
+    """
+    with transaction.atomic():
+        rows = model.objects.select_for_update().order_by("id")
+        if after_id is not None:
+            rows = rows.filter(id__gt=after_id)
+        sold_by_id = dict(rows.values_list("id", "sold")[:batch_size])
+        if not sold_by_id:
+            return None, 0
+
+        actual_by_id = dict(
+            Registration.objects.filter(
+                **{f"{count_field}__in": sold_by_id},
+                status__in=Registration.SEAT_STATUSES,
+            )
+            .values_list(count_field)
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+
+        repaired = 0
+        for obj_id, sold in sold_by_id.items():
+            actual = actual_by_id.get(obj_id, 0)
+            if sold != actual:
+                logger.warning(
+                    f"Seat counter drift on {kind} {obj_id}: sold={sold}, actual={actual}"
+                )
+                model.objects.filter(id=obj_id).update(sold=actual)
+                repaired += 1
+
+        # Refresh the Redis copy of the whole batch once the recount commits
+        counts = {str(obj_id): actual_by_id.get(obj_id, 0) for obj_id in sold_by_id}
+        transaction.on_commit(lambda: seat_availability.store(kind, counts))
+
+    return max(sold_by_id), repaired
+
+
+@shared_task
+def reconcile_seat_counters(batch_size=None):
+    """
+    Compare the sold counters of every ticket and event with their held and
+    confirmed registrations, repair drift in Postgres and refresh the Redis
+    counters.
+    """
+    batch_size = batch_size or settings.SEAT_RECONCILE_BATCH_SIZE
+    repaired = {}
+
+    for kind, model, count_field in (
+        ("ticket", Ticket, "ticket_id"),
+        ("event", Event, "ticket__event_id"),
+    ):
+        repaired[kind] = 0
+        after_id = None
+        while True:
+            after_id, batch_repaired = _reconcile_batch(
+                kind, model, count_field, after_id, batch_size
+            )
+            if after_id is None:
+                break
+            repaired[kind] += batch_repaired
+
+    logger.info(
+        f"Reconciled seat counters: repaired {repaired['ticket']} tickets "
+        f"and {repaired['event']} events"
+    )
+    return f"Repaired {repaired['ticket']} tickets and {repaired['event']} events"
+
+
+@shared_task(bind=True)
+def relay_outbox(self, batch_size=None):
+    """
+    Publish pending outbox messages to the broker, oldest first.
+
+    Delivery is at least once: a crash between publishing a batch and
+    marking it published sends it again on the next run, so the tasks it
+    carries must be idempotent (reminders are, through ReminderDelivery).
+    Rows are locked with SKIP LOCKED, so overlapping relays split the work.
+    """
+    batch_size = batch_size or settings.OUTBOX_RELAY_BATCH_SIZE
+    published = 0
+
+    while True:
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(published_at__isnull=True)
+                .order_by("id")[:batch_size]
+            )
+            if not messages:
+                break
+
+            sent_ids = []
+            failed = None
+            # One broker connection for the whole batch
+            with self.app.producer_or_acquire() as producer:
+                for message in messages:
+                    try:
+                        self.app.send_task(
+                            message.task,
+                            args=message.args,
+                            kwargs=message.kwargs,
+                            producer=producer,
+                        )
+                    except Exception as e:
+                        # Keep the order: the rest waits for the next run
+                        failed = (message, e)
+                        break
+                    sent_ids.append(message.id)
+
+            if sent_ids:
+                OutboxMessage.objects.filter(id__in=sent_ids).update(
+                    published_at=timezone.now(), attempts=F("attempts") + 1
+                )
+            if failed:
+                message, error = failed
+                OutboxMessage.objects.filter(id=message.id).update(
+                    attempts=F("attempts") + 1, last_error=str(error)
+                )
+
+        published += len(sent_ids)
+        if failed:
+            logger.error(
+                f"Outbox relay failed on message {message.id} ({message.task}): {str(error)}"
+            )
+            break
+        if len(messages) < batch_size:
+            break
+
+    # Published messages are only kept for troubleshooting
+    purged, _ = OutboxMessage.objects.filter(
+        published_at__lt=timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    ).delete()
+
+    if published or purged:
+        logger.info(f"Outbox relay published {published} messages, purged {purged}")
+    return f"Published {published} messages"
+
+
+@shared_task
+def promote_waitlists(sweep=False):
+    """
+    Promote the waitlists of the tickets that got seats back.
+
+    Args:
+        sweep: Restore the queues from Postgres and try every ticket with
+            waiters, not only the flagged ones
+    """
+    if sweep:
+        waitlist.rebuild(WaitlistEntry.objects.all())
+
+    promoted = 0
+    failed = []
+    while flagged := waitlist.pop_flagged():
+        for ticket_id, flagged_at in flagged:
+            try:
+                count = waitlist.promote(
+                    ticket_id, settings.WAITLIST_PROMOTION_BATCH_SIZE
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to promote the waitlist of ticket {ticket_id}: {str(e)}"
+                )
+                failed.append(ticket_id)
+                continue
+            if count:
+                latency = time.time() - flagged_at
+                WAITLIST_PROMOTION_LATENCY.observe(latency)
+                logger.info(
+                    f"Promoted {count} waitlisted users on ticket {ticket_id} "
+                    f"{latency:.2f}s after seats were freed"
+                )
+            promoted += count
+
+    # Flagged again only now, so the next run retries them instead of this one
+    for ticket_id in failed:
+        waitlist.flag(ticket_id)
+
+    return f"Promoted {promoted} waitlisted users"
+
+
+@shared_task
+def send_waitlist_promotion_emails(entry_ids):
+    """
+    Tell promoted users they got a seat, over a single SMTP connection
+
+    Each entry is claimed by setting ``notified_at`` before its email is
+    sent, so redelivered or overlapping runs skip users notified already.
+    A failed email gives the claim back for the next run.
+
+    Args:
+        entry_ids: IDs of promoted waitlist entries
+    """
+    entries = (
+        WaitlistEntry.objects.filter(
+            id__in=entry_ids, status=WaitlistEntry.PROMOTED, notified_at__isnull=True
+        )
+        .exclude(user__email__isnull=True)
+        .exclude(user__email="")
+        .select_related("user", "ticket__event", "registration")
+    )
+
+    sent = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for entry in entries:
+            user = entry.user
+            event = entry.ticket.event
+            name = (
+                f"{user.first_name or ''} {user.last_name or ''}".strip()
+                or user.username
+            )
+            registration = entry.registration
+            if registration and registration.status == Registration.HELD:
+                next_step = (
+                    f"It is held for you until "
+                    f"{registration.hold_expires_at.strftime('%Y-%m-%d %H:%M:%S UTC')}; "
+                    f"complete the payment before then to keep it."
+                )
+            else:
+                next_step = "You are registered; no further action is needed."
+            message = EmailMessage(
+                subject=f"You're in: {event.name}",
+                body=(
+                    f"Hi {name},\n\n"
+                    f"A seat for {entry.ticket.name} at {event.name} opened up and is now "
+                    f"yours. {next_step}\n\n"
+                    f"Date & Time: {event.start_time.strftime('%Y-%m-%d %H:%M:%S UTC')}\n"
+                    f"Location: {event.location}\n\n"
+                    f"Best regards,\nDicoEvent Team"
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[user.email],
+                connection=connection,
+            )
+            if not WaitlistEntry.objects.filter(
+                id=entry.id, notified_at__isnull=True
+            ).update(notified_at=timezone.now()):
+                # Another run notified this user in the meantime
+                continue
+            try:
+                message.send()
+                sent += 1
+            except Exception as e:
+                logger.error(
+                    f"Failed to send waitlist promotion email to {user.email}: {str(e)}"
+                )
+                WaitlistEntry.objects.filter(id=entry.id).update(notified_at=None)
+    finally:
+        connection.close()
+
+    logger.info(f"Sent {sent}/{len(entry_ids)} waitlist promotion emails")
+    return f"Sent {sent} waitlist promotion emails"
+
+
+@shared_task
+def expire_seat_holds():
+    """
+    Expire the seat holds whose payment window has passed and give their
+    seats back, in batches, until none is left.
+    """
+    started = time.monotonic()
+    expired = 0
+    while count := reservation_service.expire_holds(
+        settings.SEAT_HOLD_SWEEP_BATCH_SIZE
+    ):
+        expired += count
+
+    if expired:
+        from .cache import registrations_list_cache
+
+        registrations_list_cache.invalidate()
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Expired {expired} seat holds in {elapsed:.2f}s "
+            f"({expired / elapsed:.0f} holds/s)"
+        )
+    return f"Expired {expired} seat holds"
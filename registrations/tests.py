@@ -1,3 +1,216 @@
-from django.test import TestCase
+import threading
+from unittest import skipUnless
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+from DicoEvent.testing import (
+    QueryBudgetMixin,
+    create_event,
+    create_registrations,
+    create_ticket,
+    create_users,
+)
+from .models import Registration, WaitlistEntry
+from .serializers import RegistrationBulkCreateSerializer, RegistrationCreateSerializer
+from .services import reservation_service
+from .tasks import send_waitlist_promotion_emails
 
-# Create your tests here.
+User = get_user_model()
+
+
+class RegistrationListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """The registration list runs a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        ticket = create_ticket(create_event(organizer))
+        create_registrations(ticket, create_users(60, "attendee"))
+        cls.admin = User.objects.create_superuser(username="admin", password="secret")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_query_budget(self):
+        # The page, plus the role lookup of the permission check
+        with self.assertMaxQueries(2):
+            response = self.client.get("/api/registrations/")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["registrations"]), settings.LIST_PAGE_SIZE)
+
+
+class RegistrationBulkPermissionTests(APITestCase):
+    """Only organizers and admins register users in bulk."""
+
+    def test_regular_user_is_refused(self):
+        user = User.objects.create_user(username="attendee", password="secret")
+        ticket = create_ticket(create_event(user))
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            "/api/registrations/bulk/",
+            {"registrations": [{"ticket_id": str(ticket.id), "user_id": str(user.id)}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Registration.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class WaitlistPromotionEmailTests(TestCase):
+    """Promoted users hear about their seat once, however often the task runs."""
+
+    def test_redelivered_task_emails_once(self):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        ticket = create_ticket(create_event(organizer), price=0)
+        users = create_users(2, "attendee", with_email=True)
+        entries = [
+            WaitlistEntry.objects.create(
+                ticket=ticket,
+                user=user,
+                status=WaitlistEntry.PROMOTED,
+                registration=registration,
+                promoted_at=timezone.now(),
+            )
+            for user, registration in zip(users, create_registrations(ticket, users))
+        ]
+        entry_ids = [str(entry.id) for entry in entries]
+
+        send_waitlist_promotion_emails(entry_ids)
+        send_waitlist_promotion_emails(entry_ids)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(user.email for user in users),
+        )
+
+
+class ReservationServiceTests(TestCase):
+    """Seat counters of tickets and events follow every registration."""
+
+    def setUp(self):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        self.event = create_event(organizer, quota=2)
+        self.ticket = create_ticket(self.event, quota=1)
+        self.users = create_users(3, "attendee")
+
+    def register(self, ticket, user):
+        reservation_service.reserve(ticket.id)
+        return Registration.objects.create(ticket=ticket, user=user)
+
+    def assertSold(self, ticket_sold, event_sold):
+        self.ticket.refresh_from_db()
+        self.event.refresh_from_db()
+        self.assertEqual(self.ticket.sold, ticket_sold)
+        self.assertEqual(self.event.sold, event_sold)
+
+    def test_sold_out_ticket(self):
+        self.register(self.ticket, self.users[0])
+        with self.assertRaisesMessage(ValidationError, "Ticket is sold out."):
+            reservation_service.reserve(self.ticket.id)
+        self.assertSold(1, 1)
+
+    def test_sold_out_event_with_ticket_seats_left(self):
+        other = create_ticket(self.event, name="Late", quota=5)
+        self.register(self.ticket, self.users[0])
+        self.register(other, self.users[1])
+        with self.assertRaisesMessage(ValidationError, "Event is sold out."):
+            reservation_service.reserve(other.id)
+        # The ticket's seat is rolled back with the event's
+        other.refresh_from_db()
+        self.assertEqual(other.sold, 1)
+        self.assertSold(1, 2)
+
+    def test_delete_releases_the_seat(self):
+        self.register(self.ticket, self.users[0]).delete()
+        self.assertSold(0, 0)
+
+    def test_cancel_releases_the_seat_once(self):
+        registration = self.register(self.ticket, self.users[0])
+        self.assertTrue(reservation_service.cancel(registration.id))
+        self.assertFalse(reservation_service.cancel(registration.id))
+        self.assertSold(0, 0)
+
+        # A cancelled registration gave its seat back already
+        registration.delete()
+        self.assertSold(0, 0)
+
+    def test_cascade_releases_the_seat(self):
+        self.register(self.ticket, self.users[0])
+        self.users[0].delete()
+        self.assertSold(0, 0)
+
+        self.register(self.ticket, self.users[1])
+        self.ticket.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.sold, 0)
+
+    def rebook(self, serializer_class, data):
+        serializer = serializer_class(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    def test_racing_rebookings_reserve_one_seat(self):
+        # Seats to spare, so only the rebooking guard stops a second seat
+        self.ticket = create_ticket(self.event, name="Late", quota=5)
+        registration = self.register(self.ticket, self.users[0])
+        reservation_service.cancel(registration.id)
+        data = {"ticket_id": str(self.ticket.id), "user_id": str(self.users[0].id)}
+        bulk_data = {"registrations": [data]}
+
+        # Both requests validate before either one rebooks
+        single = self.rebook(RegistrationCreateSerializer, data)
+        bulk = self.rebook(RegistrationBulkCreateSerializer, bulk_data)
+        single.save()
+        with self.assertRaises(serializers.ValidationError):
+            bulk.save()
+        self.assertSold(1, 1)
+
+        reservation_service.cancel(registration.id)
+        bulk = self.rebook(RegistrationBulkCreateSerializer, bulk_data)
+        single = self.rebook(RegistrationCreateSerializer, data)
+        bulk.save()
+        with self.assertRaises(serializers.ValidationError):
+            single.save()
+        self.assertSold(1, 1)
+
+
+@skipUnless(connection.vendor == "postgresql", "Concurrent reservations need row locks")
+class ConcurrentReservationTests(TransactionTestCase):
+    """Reservations made at the same moment on separate connections."""
+
+    def test_concurrent_reservations_stop_at_the_quota(self):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        event = create_event(organizer, quota=5)
+        ticket = create_ticket(event, quota=10)
+        runs = 12
+        barrier = threading.Barrier(runs)
+        reserved = []
+
+        def run():
+            try:
+                barrier.wait()
+                reservation_service.reserve(ticket.id)
+                reserved.append(True)
+            except ValidationError:
+                pass
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run) for _ in range(runs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ticket.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual(len(reserved), 5)
+        self.assertEqual(ticket.sold, 5)
+        self.assertEqual(event.sold, 5)
@@ -1,8 +1,21 @@
 from django.urls import path
-from .views import RegistrationsView, RegistrationDetailView
+from .views import (
+    RegistrationsView,
+    RegistrationBulkView,
+    RegistrationDetailView,
+    WaitlistView,
+    WaitlistEntryView,
+)
 
 urlpatterns = [
     path("", RegistrationsView.as_view(), name="registrations"),
+    path("bulk/", RegistrationBulkView.as_view(), name="registrations_bulk"),
+    path("waitlist/", WaitlistView.as_view(), name="waitlist"),
+    path(
+        "waitlist/<uuid:entry_id>/",
+        WaitlistEntryView.as_view(),
+        name="waitlist_entry",
+    ),
     path(
         "<uuid:registration_id>/",
         RegistrationDetailView.as_view(),
@@ -1,17 +1,28 @@
-from rest_framework import status
+import time
+from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.core.cache import cache
 from django.conf import settings
+from DicoEvent.pagination import InvalidCursor, keyset_page_data, stream_ndjson
 from loguru import logger
-from users.permissions import IsAdminOrSuperUser, IsAuthenticatedUser
-from .models import Registration
+from users.permissions import (
+    IsAdminOrSuperUser,
+    IsAuthenticatedUser,
+    IsOrganizerAdminOrSuperUser,
+)
+from .cache import registrations_list_cache
+from .models import Registration, WaitlistEntry
 from .serializers import (
+    RegistrationBulkCreateSerializer,
     RegistrationCreateSerializer,
     RegistrationListSerializer,
     RegistrationDetailSerializer,
     RegistrationUpdateSerializer,
+    WaitlistEntrySerializer,
+    WaitlistJoinSerializer,
 )
+from .waitlist import waitlist
 
 
 class RegistrationsView(APIView):
@@ -21,9 +32,16 @@ class RegistrationsView(APIView):
         return [IsAuthenticatedUser()]
 
     def get(self, request):
+        registrations = Registration.objects.select_related("ticket__event", "user")
+
+        if request.GET.get("stream") == "ndjson":
+            return stream_ndjson(registrations, RegistrationListSerializer)
+
+        cursor = request.GET.get("cursor")
+
         # Try to get from cache first
-        cache_key = "registrations_list"
-        cached_data = cache.get(cache_key)
+        cache_key = f"cursor_{cursor or ''}"
+        cached_data = registrations_list_cache.get(cache_key)
         
         if cached_data:
             # Return cached data with X-Data-Source header
@@ -31,13 +49,18 @@ class RegistrationsView(APIView):
             response['X-Data-Source'] = 'cache'
             return response
         
-        # If not in cache, get from database
-        registrations = Registration.objects.all()
-        serializer = RegistrationListSerializer(registrations, many=True)
-        data = {"registrations": serializer.data}
+        # If not in cache, get one page from database
+        try:
+            data = keyset_page_data(
+                registrations, cursor, RegistrationListSerializer, "registrations"
+            )
+        except InvalidCursor:
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Cache the data for 1 hour
-        cache.set(cache_key, data, settings.CACHE_TTL)
+        registrations_list_cache.set(cache_key, data)
         
         # Return fresh data with X-Data-Source header
         response = Response(data, status=status.HTTP_200_OK)
@@ -53,7 +76,7 @@ class RegistrationsView(APIView):
                 registration = serializer.save()
                 
                 # Invalidate registrations list cache
-                cache.delete("registrations_list")
+                registrations_list_cache.invalidate()
                 
                 logger.info(f"Registration {registration.id} created successfully by {getattr(request.user, 'username', 'anonymous')}")
                 return Response(
@@ -63,7 +86,10 @@ class RegistrationsView(APIView):
             else:
                 logger.warning(f"Registration creation failed - Validation errors: {serializer.errors}")
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-                
+
+        except serializers.ValidationError as e:
+            logger.warning(f"Registration creation rejected: {e.detail}")
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error creating registration: {str(e)}")
             return Response(
@@ -72,6 +98,47 @@ class RegistrationsView(APIView):
             )
 
 
+class RegistrationBulkView(APIView):
+    # Registers any user given, so it is kept to organizers and admins
+    permission_classes = [IsOrganizerAdminOrSuperUser]
+
+    def post(self, request):
+        username = getattr(request.user, 'username', 'anonymous')
+        started = time.monotonic()
+
+        try:
+            serializer = RegistrationBulkCreateSerializer(data=request.data)
+            if not serializer.is_valid():
+                logger.warning(f"Bulk registration rejected - Validation errors: {serializer.errors}")
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            registration_ids = serializer.save()
+
+            # Invalidate registrations list cache
+            registrations_list_cache.invalidate()
+
+            elapsed = time.monotonic() - started
+            rate = len(registration_ids) / elapsed if elapsed else float(len(registration_ids))
+            logger.info(
+                f"Bulk registration of {len(registration_ids)} rows by {username} "
+                f"in {elapsed:.2f}s ({rate:.0f} rows/sec)"
+            )
+            return Response(
+                {"created": len(registration_ids), "registrations": registration_ids},
+                status=status.HTTP_201_CREATED,
+            )
+
+        except serializers.ValidationError as e:
+            logger.warning(f"Bulk registration rejected: {e.detail}")
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error creating bulk registrations: {str(e)}")
+            return Response(
+                {"error": "Failed to create registrations"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class RegistrationDetailView(APIView):
     def get_permissions(self):
         if self.request.method == "GET":
@@ -80,7 +147,9 @@ class RegistrationDetailView(APIView):
 
     def get_object(self, registration_id):
         try:
-            return Registration.objects.get(id=registration_id)
+            return Registration.objects.select_related("ticket__event", "user").get(
+                id=registration_id
+            )
         except Registration.DoesNotExist:
             return None
 
@@ -127,7 +196,7 @@ class RegistrationDetailView(APIView):
             # Invalidate cache for this specific registration detail
             cache.delete(f"registration_detail_{registration_id}")
             # Invalidate registrations list cache
-            cache.delete("registrations_list")
+            registrations_list_cache.invalidate()
             
             response_serializer = RegistrationDetailSerializer(updated_registration)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -145,6 +214,53 @@ class RegistrationDetailView(APIView):
         # Invalidate cache for this specific registration detail
         cache.delete(f"registration_detail_{registration_id}")
         # Invalidate registrations list cache
-        cache.delete("registrations_list")
+        registrations_list_cache.invalidate()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class WaitlistView(APIView):
+    permission_classes = [IsAuthenticatedUser]
+
+    def post(self, request):
+        serializer = WaitlistJoinSerializer(data=request.data)
+        if serializer.is_valid():
+            try:
+                entry = serializer.save()
+            except serializers.ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+            logger.info(f"User {entry.user_id} joined the waitlist of ticket {entry.ticket_id}")
+            return Response(
+                serializer.to_representation(entry), status=status.HTTP_201_CREATED
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class WaitlistEntryView(APIView):
+    permission_classes = [IsAuthenticatedUser]
+
+    def get_object(self, entry_id):
+        try:
+            return WaitlistEntry.objects.get(id=entry_id)
+        except WaitlistEntry.DoesNotExist:
+            return None
+
+    def get(self, request, entry_id):
+        # Not cached: the position moves with every promotion
+        entry = self.get_object(entry_id)
+        if entry is None:
+            return Response(
+                {"detail": "Waitlist entry not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(WaitlistEntrySerializer(entry).data, status=status.HTTP_200_OK)
+
+    def delete(self, request, entry_id):
+        entry = self.get_object(entry_id)
+        if entry is None:
+            return Response(
+                {"detail": "Waitlist entry not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        waitlist.leave(entry)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,268 @@
+import time
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from loguru import logger
+from events.models import Event
+from tickets.models import Ticket
+from .models import OutboxMessage, Registration, WaitlistEntry
+from .services import reservation_service
+
+
+class Waitlist:
+    """
+    First-come, first-served waitlists of sold-out tickets.
+
+    Entries are rows in Postgres. The order of each ticket's queue is a
+    Redis sorted set of entry IDs scored by join time, so a user's position
+    is a ZRANK and the head of the queue a ZRANGE rather than scans of the
+    entries table. Tickets that got seats back are flagged in a second
+    sorted set, scored by when the seat was freed, which the promotion
+    worker (``registrations.tasks.promote_waitlists``) drains.
+    """
+
+    promotions_key = "waitlist_promotions"
+
+    def _redis(self):
+        return get_redis_connection("default")
+
+    def _queue_key(self, ticket_id):
+        return f"waitlist_{ticket_id}"
+
+    def join(self, ticket_id, user_id):
+        """
+        Queue a user for a sold-out ticket.
+
+        Args:
+            ticket_id: ID of an existing ticket
+            user_id: ID of an existing user
+
+        Returns:
+            WaitlistEntry: The new entry
+
+        Raises:
+            ValidationError: If the ticket still has seats, or the user is
+            already registered or waiting for it
+        """
+        ticket = Ticket.objects.select_related("event").get(id=ticket_id)
+        if ticket.sold < ticket.quota and ticket.event.sold < ticket.event.quota:
+            raise ValidationError("Ticket has seats left, register instead.")
+
+        if Registration.objects.filter(
+            ticket_id=ticket_id, user_id=user_id, status__in=Registration.SEAT_STATUSES
+        ).exists():
+            raise ValidationError("User is already registered for this ticket.")
+
+        try:
+            with transaction.atomic():
+                entry = WaitlistEntry.objects.create(
+                    ticket_id=ticket_id, user_id=user_id
+                )
+        except IntegrityError:
+            raise ValidationError("User is already on the waitlist for this ticket.")
+
+        self._redis().zadd(
+            self._queue_key(ticket_id), {str(entry.id): entry.created_at.timestamp()}
+        )
+        # A seat may have been freed since the check above
+        self.flag(ticket_id)
+        return entry
+
+    def position(self, entry):
+        """Get the 1-based position of a waiting entry, or None if it is not queued."""
+        rank = self._redis().zrank(self._queue_key(entry.ticket_id), str(entry.id))
+        return None if rank is None else rank + 1
+
+    def leave(self, entry):
+        """Take a waiting entry off its ticket's waitlist."""
+        WaitlistEntry.objects.filter(id=entry.id, status=WaitlistEntry.WAITING).update(
+            status=WaitlistEntry.CANCELLED
+        )
+        self._redis().zrem(self._queue_key(entry.ticket_id), str(entry.id))
+
+    def flag(self, ticket_id):
+        """Mark a ticket as having seats for its waitlist, keeping the earliest time."""
+        self._redis().zadd(self.promotions_key, {str(ticket_id): time.time()}, nx=True)
+
+    def flag_on_commit(self, ticket_id):
+        transaction.on_commit(lambda: self.flag(ticket_id))
+
+    def pop_flagged(self, limit=100):
+        """
+        Take the tickets flagged for promotion, oldest first.
+
+        Returns:
+            list: (ticket ID, epoch second the ticket was flagged) pairs
+        """
+        return [
+            (member.decode() if isinstance(member, bytes) else member, flagged_at)
+            for member, flagged_at in self._redis().zpopmin(self.promotions_key, limit)
+        ]
+
+    def promote(self, ticket_id, batch_size):
+        """
+        Turn the free seats of a ticket into registrations for the head of
+        its waitlist, in batches.
+
+        Each batch locks the ticket and its event, reserves the seats and
+        registers the users in one transaction, then queues the promotion
+        emails and reminder checks through the outbox. Users who registered
+        on their own in the meantime are dropped from the queue.
+
+        Args:
+            ticket_id: ID of the ticket to promote waiters on
+            batch_size: Entries read from the head of the queue per batch
+
+        Returns:
+            int: Number of users promoted
+        """
+        redis = self._redis()
+        queue_key = self._queue_key(ticket_id)
+        promoted = 0
+
+        while True:
+            head = [
+                member.decode() if isinstance(member, bytes) else member
+                for member in redis.zrange(queue_key, 0, batch_size - 1)
+            ]
+            if not head:
+                return promoted
+
+            with transaction.atomic():
+                ticket = Ticket.objects.select_for_update().filter(id=ticket_id).first()
+                if ticket is None:
+                    return promoted
+                event = Event.objects.select_for_update().get(id=ticket.event_id)
+                free = min(ticket.quota - ticket.sold, event.quota - event.sold)
+                if free <= 0:
+                    return promoted
+
+                entries = list(
+                    WaitlistEntry.objects.filter(
+                        id__in=head, status=WaitlistEntry.WAITING
+                    ).order_by("created_at", "id")
+                )
+                # Entries no longer waiting only need to leave the queue
+                done_ids = set(head) - {str(entry.id) for entry in entries}
+
+                registrations = dict(
+                    Registration.objects.filter(
+                        ticket_id=ticket_id,
+                        user_id__in=[entry.user_id for entry in entries],
+                    ).values_list("user_id", "status")
+                )
+                chosen = []
+                skipped = []
+                for entry in entries:
+                    if len(chosen) == free:
+                        break
+                    if registrations.get(entry.user_id) in Registration.SEAT_STATUSES:
+                        skipped.append(entry)
+                    else:
+                        chosen.append(entry)
+                    done_ids.add(str(entry.id))
+
+                if skipped:
+                    WaitlistEntry.objects.filter(
+                        id__in=[entry.id for entry in skipped]
+                    ).update(status=WaitlistEntry.CANCELLED)
+                if chosen:
+                    self._register(ticket, chosen, registrations)
+
+                transaction.on_commit(
+                    lambda ids=list(done_ids): redis.zrem(queue_key, *ids)
+                )
+
+            promoted += len(chosen)
+            if not done_ids:
+                return promoted
+
+    def _register(self, ticket, entries, registrations):
+        """Reserve seats and register (hold, for paid tickets) the users of the given entries."""
+        ticket_id = ticket.id
+        now = timezone.now()
+        reservation_service.reserve(ticket_id, seats=len(entries))
+        state = reservation_service.new_registration_state(ticket.price)
+
+        # Rebook cancelled and expired registrations, insert the others
+        rebooked_users = [
+            entry.user_id for entry in entries if entry.user_id in registrations
+        ]
+        if rebooked_users:
+            Registration.objects.filter(
+                ticket_id=ticket_id, user_id__in=rebooked_users
+            ).update(updated_at=now, **state)
+        Registration.objects.bulk_create(
+            [
+                Registration(ticket_id=ticket_id, user_id=entry.user_id, **state)
+                for entry in entries
+                if entry.user_id not in rebooked_users
+            ]
+        )
+        registration_ids = dict(
+            Registration.objects.filter(
+                ticket_id=ticket_id, user_id__in=[entry.user_id for entry in entries]
+            ).values_list("user_id", "id")
+        )
+
+        for entry in entries:
+            entry.status = WaitlistEntry.PROMOTED
+            entry.registration_id = registration_ids[entry.user_id]
+            entry.promoted_at = now
+        WaitlistEntry.objects.bulk_update(
+            entries, ["status", "registration", "promoted_at"]
+        )
+
+        OutboxMessage.objects.enqueue(
+            "registrations.tasks.send_waitlist_promotion_emails",
+            [str(entry.id) for entry in entries],
+        )
+        # bulk_create skips post_save, which queues the reminder check
+        OutboxMessage.objects.enqueue(
+            "events.tasks.send_reminders_for_new_registrations",
+            [str(registration_id) for registration_id in registration_ids.values()],
+        )
+
+    def rebuild(self, entries):
+        """
+        Restore the Redis queues from the waiting entries in the database
+        and flag every ticket that has waiters.
+
+        Entries are re-added with their original scores, so running this
+        against live queues changes nothing but what Redis had lost.
+
+        Args:
+            entries: Queryset of waitlist entries
+
+        Returns:
+            int: Number of entries queued
+        """
+        redis = self._redis()
+        waiting = entries.filter(status=WaitlistEntry.WAITING)
+        ticket_ids = set(waiting.values_list("ticket_id", flat=True).distinct())
+
+        count = 0
+        pipeline = redis.pipeline()
+        for entry_id, ticket_id, created_at in waiting.values_list(
+            "id", "ticket_id", "created_at"
+        ).iterator(chunk_size=2000):
+            pipeline.zadd(
+                self._queue_key(ticket_id), {str(entry_id): created_at.timestamp()}
+            )
+            count += 1
+            if count % 2000 == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        for ticket_id in ticket_ids:
+            self.flag(ticket_id)
+
+        logger.info(
+            f"Rebuilt waitlists of {len(ticket_ids)} tickets with {count} entries"
+        )
+        return count
+
+
+# Global instance
+waitlist = Waitlist()
@@ -0,0 +1,30 @@
+from DicoEvent import cache as async_cache
+from DicoEvent.async_views import AsyncReadView, json_response
+from registrations.services import seat_availability
+from .models import Ticket
+from .serializers import TicketDetailSerializer
+from .views import TicketDetailView
+
+
+class AsyncTicketDetailView(AsyncReadView):
+    """Async GET /api/tickets/<id>/ with the same payload and cache as TicketDetailView."""
+
+    write_view = TicketDetailView
+
+    async def get(self, request, ticket_id):
+        cache_key = f"ticket_detail_{ticket_id}"
+        cached_data = await async_cache.aget(cache_key)
+        if cached_data:
+            await seat_availability.aoverlay("ticket", [cached_data])
+            return json_response(cached_data, source="cache")
+
+        ticket = (
+            await Ticket.objects.select_related("event").filter(id=ticket_id).afirst()
+        )
+        if ticket is None:
+            return json_response({"detail": "Ticket not found."}, status=404)
+
+        data = TicketDetailSerializer(ticket).data
+        await async_cache.aset(cache_key, data)
+
+        return json_response(data, source="database")
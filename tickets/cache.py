@@ -0,0 +1,4 @@
+from DicoEvent.cache import CacheNamespace
+
+# Every cached page of the ticket list, invalidated as a whole on writes
+tickets_list_cache = CacheNamespace("tickets_list")
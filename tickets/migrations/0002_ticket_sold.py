@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_sold(apps, schema_editor):
+    """Seed the seat counters from the registrations that already exist."""
+    Event = apps.get_model("events", "Event")
+    Ticket = apps.get_model("tickets", "Ticket")
+    Registration = apps.get_model("registrations", "Registration")
+
+    registrations_per_ticket = (
+        Registration.objects.filter(ticket=OuterRef("pk"))
+        .values("ticket")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Ticket.objects.update(sold=Coalesce(Subquery(registrations_per_ticket), 0))
+
+    sold_per_event = (
+        Ticket.objects.filter(event=OuterRef("pk"))
+        .values("event")
+        .annotate(total=Sum("sold"))
+        .values("total")
+    )
+    Event.objects.update(sold=Coalesce(Subquery(sold_per_event), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0001_initial"),
+        ("events", "0003_event_sold"),
+        ("registrations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="sold",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_sold, migrations.RunPython.noop),
+    ]
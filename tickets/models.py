@@ -11,6 +11,7 @@ class Ticket(models.Model):
     sales_start = models.DateTimeField()
     sales_end = models.DateTimeField()
     quota = models.PositiveIntegerField()
+    sold = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -19,3 +20,6 @@ class Ticket(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="ticket_created_id_idx"),
+        ]
@@ -36,6 +36,7 @@ class TicketCreateSerializer(serializers.ModelSerializer):
 
 class TicketListSerializer(serializers.ModelSerializer):
     event = serializers.SerializerMethodField()
+    remaining = serializers.SerializerMethodField()
 
     class Meta:
         model = Ticket
@@ -46,6 +47,8 @@ class TicketListSerializer(serializers.ModelSerializer):
             "sales_start",
             "sales_end",
             "quota",
+            "sold",
+            "remaining",
             "event",
             "created_at",
             "updated_at",
@@ -54,6 +57,9 @@ class TicketListSerializer(serializers.ModelSerializer):
     def get_event(self, obj):
         return {"id": str(obj.event.id), "name": obj.event.name}
 
+    def get_remaining(self, obj):
+        return max(obj.quota - obj.sold, 0)
+
     def to_representation(self, instance):
         return {
             "id": str(instance.id),
@@ -62,6 +68,8 @@ class TicketListSerializer(serializers.ModelSerializer):
             "sales_start": instance.sales_start.isoformat(),
             "sales_end": instance.sales_end.isoformat(),
             "quota": instance.quota,
+            "sold": instance.sold,
+            "remaining": self.get_remaining(instance),
             "event": self.get_event(instance),
             "created_at": instance.created_at.isoformat(),
             "updated_at": instance.updated_at.isoformat(),
@@ -70,6 +78,7 @@ class TicketListSerializer(serializers.ModelSerializer):
 
 class TicketDetailSerializer(serializers.ModelSerializer):
     event = serializers.SerializerMethodField()
+    remaining = serializers.SerializerMethodField()
 
     class Meta:
         model = Ticket
@@ -81,6 +90,8 @@ class TicketDetailSerializer(serializers.ModelSerializer):
             "sales_start",
             "sales_end",
             "quota",
+            "sold",
+            "remaining",
             "created_at",
             "updated_at",
         ]
@@ -88,6 +99,9 @@ class TicketDetailSerializer(serializers.ModelSerializer):
     def get_event(self, obj):
         return obj.event.name
 
+    def get_remaining(self, obj):
+        return max(obj.quota - obj.sold, 0)
+
     def to_representation(self, instance):
         return {
             "id": str(instance.id),
@@ -97,6 +111,8 @@ class TicketDetailSerializer(serializers.ModelSerializer):
             "sales_start": instance.sales_start.isoformat(),
             "sales_end": instance.sales_end.isoformat(),
             "quota": instance.quota,
+            "sold": instance.sold,
+            "remaining": self.get_remaining(instance),
             "created_at": instance.created_at.isoformat(),
             "updated_at": instance.updated_at.isoformat(),
         }
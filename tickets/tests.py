@@ -1,3 +1,25 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from DicoEvent.testing import QueryBudgetMixin, create_events, create_tickets
 
-# Create your tests here.
+User = get_user_model()
+
+
+class TicketListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """The ticket list runs a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create_user(username="organizer", password="secret")
+        create_tickets(create_events([organizer] * 60))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_query_budget(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get("/api/tickets/")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["tickets"]), settings.LIST_PAGE_SIZE)
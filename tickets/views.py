@@ -4,7 +4,11 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from django.core.cache import cache
 from django.conf import settings
+from DicoEvent.pagination import InvalidCursor, keyset_page_data, stream_ndjson
+from registrations.services import seat_availability
+from registrations.waitlist import waitlist
 from users.permissions import IsAdminOrSuperUser
+from .cache import tickets_list_cache
 from .models import Ticket
 from .serializers import (
     TicketCreateSerializer,
@@ -21,23 +25,35 @@ class TicketsView(APIView):
         return [IsAdminOrSuperUser()]
 
     def get(self, request):
+        tickets = Ticket.objects.select_related("event")
+
+        if request.GET.get("stream") == "ndjson":
+            return stream_ndjson(tickets, TicketListSerializer)
+
+        cursor = request.GET.get("cursor")
+
         # Try to get from cache first
-        cache_key = "tickets_list"
-        cached_data = cache.get(cache_key)
+        cache_key = f"cursor_{cursor or ''}"
+        cached_data = tickets_list_cache.get(cache_key)
         
         if cached_data:
+            # Seats change far more often than the cached page is rebuilt
+            seat_availability.overlay("ticket", cached_data["tickets"])
             # Return cached data with X-Data-Source header
             response = Response(cached_data, status=status.HTTP_200_OK)
             response['X-Data-Source'] = 'cache'
             return response
         
-        # If not in cache, get from database
-        tickets = Ticket.objects.all()
-        serializer = TicketListSerializer(tickets, many=True)
-        data = {"tickets": serializer.data}
+        # If not in cache, get one page from database
+        try:
+            data = keyset_page_data(tickets, cursor, TicketListSerializer, "tickets")
+        except InvalidCursor:
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Cache the data for 1 hour
-        cache.set(cache_key, data, settings.CACHE_TTL)
+        tickets_list_cache.set(cache_key, data)
         
         # Return fresh data with X-Data-Source header
         response = Response(data, status=status.HTTP_200_OK)
@@ -50,7 +66,7 @@ class TicketsView(APIView):
             ticket = serializer.save()
             
             # Invalidate tickets list cache
-            cache.delete("tickets_list")
+            tickets_list_cache.invalidate()
             
             return Response(
                 serializer.to_representation(ticket), status=status.HTTP_201_CREATED
@@ -66,7 +82,7 @@ class TicketDetailView(APIView):
 
     def get_object(self, ticket_id):
         try:
-            return Ticket.objects.get(id=ticket_id)
+            return Ticket.objects.select_related("event").get(id=ticket_id)
         except Ticket.DoesNotExist:
             return None
 
@@ -76,6 +92,7 @@ class TicketDetailView(APIView):
         cached_data = cache.get(cache_key)
         
         if cached_data:
+            seat_availability.overlay("ticket", [cached_data])
             # Return cached data with X-Data-Source header
             response = Response(cached_data, status=status.HTTP_200_OK)
             response['X-Data-Source'] = 'cache'
@@ -109,11 +126,13 @@ class TicketDetailView(APIView):
         serializer = TicketUpdateSerializer(ticket, data=request.data)
         if serializer.is_valid():
             updated_ticket = serializer.save()
+            # A raised quota may have room for the waitlist
+            waitlist.flag(ticket_id)
             
             # Invalidate cache for this specific ticket detail
             cache.delete(f"ticket_detail_{ticket_id}")
             # Invalidate tickets list cache
-            cache.delete("tickets_list")
+            tickets_list_cache.invalidate()
             
             response_serializer = TicketDetailSerializer(updated_ticket)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -131,6 +150,6 @@ class TicketDetailView(APIView):
         # Invalidate cache for this specific ticket detail
         cache.delete(f"ticket_detail_{ticket_id}")
         # Invalidate tickets list cache
-        cache.delete("tickets_list")
+        tickets_list_cache.invalidate()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,51 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from .roles import get_role_version
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from the access token's claims. Exposes the same role
+    properties as ``users.models.User`` without any database query.
+    """
+
+    @cached_property
+    def is_admin(self):
+        return self.token.get("is_admin", False)
+
+    @cached_property
+    def is_organizer(self):
+        return self.token.get("is_organizer", False)
+
+    @cached_property
+    def is_staff(self):
+        return self.is_admin or self.is_superuser
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the role claims embedded at login instead
+    of loading the user row on every request.
+
+    The only per-request lookup is the user's role version in the cache, so
+    tokens are rejected as soon as the user's roles change or the user is
+    deleted. Tokens issued before role claims existed fall back to the
+    regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if "role_version" not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if validated_token["role_version"] != get_role_version(user_id):
+            raise InvalidToken("Token roles are outdated, please refresh the token")
+
+        return ClaimsUser(validated_token)
@@ -0,0 +1,4 @@
+from DicoEvent.cache import CacheNamespace
+
+# Every cached page of the user list, invalidated as a whole on writes
+users_list_cache = CacheNamespace("users_list")
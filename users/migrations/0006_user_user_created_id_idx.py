@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_auto_20250802_0124"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="user_created_id_idx"
+            ),
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
+    Group,
     PermissionsMixin,
 )
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
 import uuid
 
 
@@ -38,14 +42,70 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.username
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="user_created_id_idx"),
+        ]
+
     @property
     def is_staff(self):
         return self.is_admin or self.is_superuser
 
+    @cached_property
+    def role_names(self):
+        """
+        Names of the user's groups, loaded once per instance. Since DRF
+        keeps the same ``request.user`` for the whole request, every role
+        check in a request shares a single query.
+        """
+        from .roles import get_role_names
+
+        return get_role_names(self)
+
     @property
     def is_admin(self):
-        return self.groups.filter(name="admin").exists()
+        return "admin" in self.role_names
 
     @property
     def is_organizer(self):
-        return self.groups.filter(name="organizer").exists()
+        return "organizer" in self.role_names
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def handle_group_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate cached roles when users join or leave groups, from either
+    side of the relation (``user.groups`` or ``group.user_set``).
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    from .roles import invalidate_user_roles
+
+    if not reverse:
+        invalidate_user_roles([instance.pk])
+    elif pk_set:
+        invalidate_user_roles(pk_set)
+    else:
+        # group.user_set.clear() does not report which users were removed
+        invalidate_user_roles()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def handle_group_change(sender, instance, **kwargs):
+    """Invalidate every cached role set when a group is renamed or deleted."""
+    if kwargs.get("created"):
+        return
+
+    from .roles import invalidate_user_roles
+
+    invalidate_user_roles()
+
+
+@receiver(post_delete, sender=User)
+def handle_deleted_user(sender, instance, **kwargs):
+    """Revoke the deleted user's access tokens by bumping their role version."""
+    from .roles import invalidate_user_roles
+
+    invalidate_user_roles([instance.pk])
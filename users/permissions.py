@@ -36,7 +36,7 @@ class IsOwnerOrReadOnly(BasePermission):
         if request.method == "GET":
             return True
         # Only allow user to update their own profile
-        return obj.id == request.user.id
+        return str(obj.id) == str(request.user.id)
 
 
 class UserDetailPermission(BasePermission):
@@ -62,7 +62,7 @@ class UserDetailPermission(BasePermission):
         if request.method == "DELETE":
             return True
         # PUT/PATCH only allow users to update their own profile
-        return obj.id == request.user.id
+        return str(obj.id) == str(request.user.id)
 
 
 class IsOrganizerOwnerOrAdmin(BasePermission):
@@ -95,7 +95,7 @@ class IsOrganizerOwnerOrAdmin(BasePermission):
 
         # Organizers can only access their own events
         if request.user.is_organizer:
-            return obj.organizer == request.user
+            return str(obj.organizer_id) == str(request.user.id)
 
         return False
 
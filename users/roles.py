@@ -0,0 +1,68 @@
+from django.conf import settings
+from DicoEvent.cache import CacheNamespace
+
+# Cross-request cache of each user's group names, keyed by user ID
+user_roles_cache = CacheNamespace("user_roles")
+
+
+def get_role_names(user):
+    """
+    Load the names of all groups a user belongs to with a single query.
+
+    Uses prefetched groups when the queryset already has them, and the
+    cross-request role cache when ROLE_CACHE_ENABLED is set.
+
+    Args:
+        user: User instance
+
+    Returns:
+        frozenset: Group names of the user
+    """
+    prefetched = getattr(user, "_prefetched_objects_cache", {})
+    if "groups" in prefetched:
+        return frozenset(group.name for group in prefetched["groups"])
+
+    if not settings.ROLE_CACHE_ENABLED:
+        return frozenset(user.groups.values_list("name", flat=True))
+
+    role_names = user_roles_cache.get(user.pk)
+    if role_names is None:
+        role_names = frozenset(user.groups.values_list("name", flat=True))
+        user_roles_cache.set(user.pk, role_names, settings.ROLE_CACHE_TTL)
+    return role_names
+
+
+def get_role_version(user_id):
+    """
+    Get the version of a user's roles, embedded in access tokens as the
+    ``role_version`` claim. It changes whenever the user's memberships
+    change, any group is renamed or deleted, or the user is deleted, which
+    revokes every access token issued before.
+
+    Args:
+        user_id: ID of the user
+
+    Returns:
+        str: Current role version
+    """
+    return f"{user_roles_cache.generation()}.{_user_role_version(user_id).generation()}"
+
+
+def _user_role_version(user_id):
+    return CacheNamespace(f"user_{user_id}_role_version")
+
+
+def invalidate_user_roles(user_ids=None):
+    """
+    Drop cached role sets and bump the matching role versions.
+
+    Args:
+        user_ids: IDs of the users whose roles changed, or None to drop the
+            cached roles of every user (e.g. when a group is renamed)
+    """
+    if user_ids is None:
+        user_roles_cache.invalidate()
+        return
+    for user_id in user_ids:
+        user_roles_cache.delete(user_id)
+        _user_role_version(user_id).invalidate()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import add_role_claims
 
 User = get_user_model()
 
@@ -53,11 +54,8 @@ class LoginSerializer(serializers.Serializer):
         refresh = RefreshToken.for_user(user)
 
         # Add user info to token payload
-        refresh["is_admin"] = user.is_admin
-        refresh["is_superuser"] = user.is_superuser
+        add_role_claims(refresh, user)
         access = refresh.access_token
-        access["is_admin"] = user.is_admin
-        access["is_superuser"] = user.is_superuser
 
         return {
             "refresh": str(refresh),
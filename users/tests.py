@@ -1,3 +1,35 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from DicoEvent.testing import QueryBudgetMixin, create_users
 
-# Create your tests here.
+User = get_user_model()
+
+
+class UserListQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """The user list runs a fixed number of queries, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = create_users(60)
+        groups = Group.objects.bulk_create([Group(name=f"group{i}") for i in range(60)])
+        User.groups.through.objects.bulk_create(
+            [
+                User.groups.through(user_id=user.id, group_id=group.id)
+                for user, group in zip(users, groups)
+            ]
+        )
+        cls.admin = User.objects.create_superuser(username="admin", password="secret")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_query_budget(self):
+        # The page and its groups, plus the role lookup of the permission check
+        with self.assertMaxQueries(3):
+            response = self.client.get("/api/users/")
+        self.assertEqual(response["X-Data-Source"], "database")
+        self.assertEqual(len(response.data["users"]), settings.LIST_PAGE_SIZE)
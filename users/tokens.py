@@ -0,0 +1,17 @@
+from .roles import get_role_version
+
+
+def add_role_claims(token, user):
+    """
+    Embed the user's identity and roles in a token so that
+    ClaimsJWTAuthentication can authorize requests without loading the user.
+
+    Args:
+        token: simplejwt token to add the claims to
+        user: User the token is issued for
+    """
+    token["username"] = user.username
+    token["is_admin"] = user.is_admin
+    token["is_organizer"] = user.is_organizer
+    token["is_superuser"] = user.is_superuser
+    token["role_version"] = get_role_version(user.pk)
@@ -1,5 +1,5 @@
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
@@ -9,7 +9,9 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.core.cache import cache
 from django.conf import settings
+from DicoEvent.pagination import InvalidCursor, keyset_page_data, stream_ndjson
 from loguru import logger
+from .cache import users_list_cache
 from .serializers import (
     UserRegistrationSerializer,
     LoginSerializer,
@@ -18,6 +20,7 @@ from .serializers import (
     UserUpdateSerializer,
 )
 from .permissions import IsAdminOrSuperUser, IsOwnerOrReadOnly, UserDetailPermission
+from .tokens import add_role_claims
 
 User = get_user_model()
 
@@ -29,9 +32,16 @@ class UsersView(APIView):
         return [AllowAny()]
 
     def get(self, request):
+        users = User.objects.prefetch_related("groups")
+
+        if request.GET.get("stream") == "ndjson":
+            return stream_ndjson(users, UserListSerializer)
+
+        cursor = request.GET.get("cursor")
+
         # Try to get from cache first
-        cache_key = "users_list"
-        cached_data = cache.get(cache_key)
+        cache_key = f"cursor_{cursor or ''}"
+        cached_data = users_list_cache.get(cache_key)
         
         if cached_data:
             # Return cached data with X-Data-Source header
@@ -39,13 +49,16 @@ class UsersView(APIView):
             response['X-Data-Source'] = 'cache'
             return response
         
-        # If not in cache, get from database
-        users = User.objects.all()
-        serializer = UserListSerializer(users, many=True)
-        data = {"users": serializer.data}
+        # If not in cache, get one page from database
+        try:
+            data = keyset_page_data(users, cursor, UserListSerializer, "users")
+        except InvalidCursor:
+            return Response(
+                {"detail": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Cache the data for 1 hour
-        cache.set(cache_key, data, settings.CACHE_TTL)
+        users_list_cache.set(cache_key, data)
         
         # Return fresh data with X-Data-Source header
         response = Response(data, status=status.HTTP_200_OK)
@@ -61,7 +74,7 @@ class UsersView(APIView):
                 user = serializer.save()
                 
                 # Invalidate users list cache
-                cache.delete("users_list")
+                users_list_cache.invalidate()
                 
                 logger.info(f"User {user.username} registered successfully")
                 return Response(
@@ -134,7 +147,7 @@ class UserDetailView(APIView):
             # Invalidate cache for this specific user detail
             cache.delete(f"user_detail_{user_id}")
             # Invalidate users list cache
-            cache.delete("users_list")
+            users_list_cache.invalidate()
             
             response_serializer = UserDetailSerializer(updated_user)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
@@ -155,7 +168,7 @@ class UserDetailView(APIView):
         # Invalidate cache for this specific user detail
         cache.delete(f"user_detail_{user_id}")
         # Invalidate users list cache
-        cache.delete("users_list")
+        users_list_cache.invalidate()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -187,6 +200,7 @@ def login(request):
 
 
 @api_view(["POST"])
+@authentication_classes([])  # The refresh token is the credential; a stale access token must not block it
 def refresh_token(request):
     refresh_token = request.data.get("refresh")
 
@@ -201,9 +215,8 @@ def refresh_token(request):
 
         # Generate new access token
         new_access_token = refresh.access_token
-        # Add user info to new access token
-        new_access_token["is_admin"] = user.is_admin
-        new_access_token["is_superuser"] = user.is_superuser
+        # Add current user info to new access token
+        add_role_claims(new_access_token, user)
 
         return Response({"access": str(new_access_token)}, status=status.HTTP_200_OK)
 